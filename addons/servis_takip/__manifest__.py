@@ -1,6 +1,6 @@
 {
     'name': 'Servis Yönetimi',
-    'version': '19.0.1.0.6',
+    'version': '19.0.1.0.10',
     'summary': 'Müşteriye ait ürünlerin teknik servis ve onarım süreçlerini takip eder.',
     'description': """
 Servis Yönetimi Modülü
@@ -32,6 +32,15 @@ teslimatına kadar tüm teknik servis süreçlerini yönetmenizi sağlar.
         # 2. VERİ ve SEQUENCE (Kayıt numaraları için)
         'data/sequences/servis_kaydi_sequence.xml',
         'data/sequences/formu_sequence.xml',
+        'data/sequences/cari_kod_sequence.xml',
+        'data/ozellestirme/ozellestirme_data.xml',
+        'data/cron/ozellestirme_cron.xml',
+        'data/cron/kpi_gunluk_cron.xml',
+        'data/cron/dovizli_fiyat_cron.xml',
+        'data/cron/form_gonderim_cron.xml',
+        'data/cron/ek_tekillestir_cron.xml',
+        'data/cron/toplam_hesapla_cron.xml',
+        'data/cron/barkod_onbellek_cron.xml',
         
         # 3. VIEWS - TANIMLAR (Definitions)
         'views/definitions/urun_views.xml',
@@ -57,6 +66,7 @@ teslimatına kadar tüm teknik servis süreçlerini yönetmenizi sağlar.
         'views/core/servis_actions.xml',
         'views/core/servis_kaydi_views.xml',
         'views/core/servis_takip_views.xml',
+        'views/core/servis_form_gonderim_views.xml',
 
         # 5.5. VIEWS - DASHBOARD
         'views/dashboard/dashboard_views.xml',
@@ -65,15 +75,24 @@ teslimatına kadar tüm teknik servis süreçlerini yönetmenizi sağlar.
         'views/reports/kabul_rapor_views.xml',
         'views/reports/teslim_rapor_views.xml',
         'views/reports/barkod_etiketi_views.xml',  # Barkod Etiketi Formu
+        'views/reports/servis_kaydi_analiz_views.xml',  # Pivot/Grafik Analizi
+        'views/reports/servis_kpi_gunluk_views.xml',  # Günlük KPI Trendi
 
         # 7. VIEWS - WIZARD'LAR
         'views/wizards/servis_urun_aktar_views.xml',
         'views/wizards/servis_formu_gonder_wizard_views.xml',
+        'views/wizards/servis_formu_toplu_gonder_wizard_views.xml',
         'views/wizards/servis_ozellestirme_views.xml',  # Özelleştirme
+        'views/wizards/servis_etiket_yazdir_wizard_views.xml',  # Toplu Etiket Yazdırma
         
         # 8. MENÜLER (En son yüklenmeli çünkü tüm Action ID'leri yukarıda tanımlandı)
         'views/misc/servis_menu.xml',
     ],
+    'assets': {
+        'web.assets_backend': [
+            'servis_takip/static/src/dashboard/*',
+        ],
+    },
     'demo': [
         # 'demo/servis_demo.xml', 
     ],
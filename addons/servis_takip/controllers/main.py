@@ -0,0 +1,53 @@
+from odoo import http, fields, _
+from odoo.exceptions import AccessError, UserError
+from odoo.http import request, content_disposition
+
+
+class ServisDashboardController(http.Controller):
+
+    @http.route('/servis_takip/dashboard/kpi', type='jsonrpc', auth='user')
+    def dashboard_kpi(self, date_from=None, date_to=None, company_id=None, filtreler=None):
+        """Dashboard göstergelerini JSON olarak döner
+
+        Kayıt oluşturmaz; sonuçlar servis.dashboard._kpi_onbellekli üzerinden
+        aynı kullanıcının aynı parametreli istekleri için kısa süre saklanır.
+        filtreler: {'musteri_id': id, 'urun_turu_id': id, 'urun_marka_id': id, 'urun_modeli_id': id}
+        """
+        env = request.env
+        env['servis.kaydi'].check_access('read')
+
+        try:
+            company_id = int(company_id or env.company.id)
+            bugun = fields.Date.context_today(env.user)
+            date_from = fields.Date.to_date(date_from) or bugun
+            date_to = fields.Date.to_date(date_to) or bugun
+            filtreler = {alan: int(deger) for alan, deger in (filtreler or {}).items() if deger}
+        except (TypeError, ValueError, AttributeError):
+            raise UserError(_("Geçersiz dashboard parametresi."))
+        if company_id not in env.user.company_ids.ids:
+            raise AccessError(_("Bu şirketin servis verilerine erişim yetkiniz yok."))
+        if date_from > date_to:
+            raise UserError(_("Başlangıç tarihi bitiş tarihinden sonra olamaz."))
+
+        return env['servis.dashboard']._kpi_onbellekli(date_from, date_to, company_id, filtreler)
+
+
+class ServisEtiketController(http.Controller):
+
+    @http.route('/servis_takip/etiket/<string:dil>', type='http', auth='user')
+    def termal_etiket(self, dil, ids='', **kwargs):
+        """Seçili servis kayıtlarının ZPL/EPL etiket metnini dosya olarak indirir
+
+        Çıktı yazıcıya ham olarak gönderilebilir (ör. lp -o raw etiket.zpl).
+        """
+        kayitlar = request.env['servis.kaydi'].browse(
+            [int(i) for i in ids.split(',') if i.isdigit()]
+        ).exists()
+        if not kayitlar:
+            return request.not_found()
+        kayitlar.check_access('read')
+        metin = kayitlar.get_termal_etiket(dil)
+        return request.make_response(metin.encode('utf-8'), headers=[
+            ('Content-Type', 'text/plain; charset=utf-8'),
+            ('Content-Disposition', content_disposition('etiket.%s' % dil)),
+        ])
@@ -0,0 +1,45 @@
+# Migration: Seed the yearly cari_kod sequence from the existing maximum codes
+# -*- coding: utf-8 -*-
+from datetime import date
+import logging
+
+from odoo import api, SUPERUSER_ID
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    """Her yıl için mevcut en büyük cari koddan sonraki numarayı date range sayacına yaz"""
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    seq = env.ref('servis_takip.sequence_res_partner_cari_kod', raise_if_not_found=False)
+    if not seq:
+        return
+
+    # Eski format YYYYNNNN (8 hane) ve yeni format YYYYNNNNN (9 hane)
+    cr.execute("""
+        SELECT left(cari_kod, 4)::int AS yil, MAX(substr(cari_kod, 5)::int)
+          FROM res_partner
+         WHERE cari_kod ~ '^[0-9]{8,9}$'
+      GROUP BY yil
+    """)
+    DateRange = env['ir.sequence.date_range']
+    for yil, son_numara in cr.fetchall():
+        if yil < 1:
+            # Ör. 00001234: yıl kısmı geçersiz, sayaç tohumlamasına girmez
+            cr.execute("SELECT array_agg(cari_kod) FROM res_partner WHERE cari_kod ~ '^0000[0-9]{4,5}$'")
+            _logger.warning("Geçersiz yıllı cari kodlar sequence tohumlamasında atlandı: %s", cr.fetchone()[0])
+            continue
+        gun = date(yil, 1, 1)
+        seq_date = DateRange.search([
+            ('sequence_id', '=', seq.id),
+            ('date_from', '<=', gun),
+            ('date_to', '>=', gun),
+        ], limit=1)
+        if not seq_date:
+            seq_date = DateRange.create({
+                'sequence_id': seq.id,
+                'date_from': gun,
+                'date_to': date(yil, 12, 31),
+            })
+        if seq_date.number_next_actual <= son_numara:
+            seq_date.number_next_actual = son_numara + 1
@@ -0,0 +1,32 @@
+# Migration: Resolve duplicate cari_kod values before the ORM adds the unique index
+# -*- coding: utf-8 -*-
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    """Mükerrer cari kodlar varsa unique index oluşturulamaz
+
+    Her koddaki en eski kontak kodu korur; diğerlerine "-<id>" eki verilir.
+    Ekli kodlar sayısal formata uymadığı için sequence tohumlamasına girmez.
+    """
+    cr.execute("""
+        SELECT cari_kod, array_agg(id ORDER BY id)
+          FROM res_partner
+         WHERE cari_kod IS NOT NULL
+      GROUP BY cari_kod
+        HAVING count(*) > 1
+    """)
+    yeniden_adlandirilacak = []
+    for cari_kod, ids in cr.fetchall():
+        _logger.warning(
+            "Mükerrer cari kod %s: %s korundu, %s kontaklarına -<id> eki verildi",
+            cari_kod, ids[0], ids[1:],
+        )
+        yeniden_adlandirilacak += ids[1:]
+    if yeniden_adlandirilacak:
+        cr.execute(
+            "UPDATE res_partner SET cari_kod = cari_kod || '-' || id WHERE id = ANY(%s)",
+            (yeniden_adlandirilacak,)
+        )
@@ -0,0 +1,43 @@
+# Migration: Fill servis_urun.seri_no_normalize in SQL before the ORM adds the unique index
+# -*- coding: utf-8 -*-
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    """400k satırlık ürün parkında compute'u ORM'e bırakmamak için kolonu SQL ile doldur"""
+    cr.execute("""
+        ALTER TABLE servis_urun
+        ADD COLUMN IF NOT EXISTS seri_no_normalize VARCHAR
+    """)
+    cr.execute("""
+        UPDATE servis_urun
+           SET seri_no_normalize = NULLIF(upper(regexp_replace(serial_no, '\\s+', '', 'g')), '')
+         WHERE seri_no_normalize IS NULL
+    """)
+
+    # Mükerrer kayıtlar varsa unique index oluşturulamaz: en eski kayıt kalır, diğerleri
+    # arşivlenir (WHERE active IS TRUE dışına düşer). Referanslar arşivli kayıtlarda kalır.
+    # NULL içeren anahtarlar index'te çakışmadığı için dokunulmaz.
+    cr.execute("""
+        SELECT seri_no_normalize, tur_id, marka_id, model_id, array_agg(id ORDER BY id)
+          FROM servis_urun
+         WHERE active IS TRUE
+           AND seri_no_normalize IS NOT NULL
+           AND tur_id IS NOT NULL
+           AND marka_id IS NOT NULL
+           AND model_id IS NOT NULL
+      GROUP BY seri_no_normalize, tur_id, marka_id, model_id
+        HAVING count(*) > 1
+    """)
+    arsivlenecek = []
+    for seri_no, tur_id, marka_id, model_id, ids in cr.fetchall():
+        _logger.warning(
+            "Ürün parkında mükerrer kayıt (seri no %s, tür %s, marka %s, model %s): "
+            "%s korundu, %s arşivlendi",
+            seri_no, tur_id, marka_id, model_id, ids[0], ids[1:],
+        )
+        arsivlenecek += ids[1:]
+    if arsivlenecek:
+        cr.execute("UPDATE servis_urun SET active = FALSE WHERE id = ANY(%s)", (arsivlenecek,))
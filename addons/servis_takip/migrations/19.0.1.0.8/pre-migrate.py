@@ -0,0 +1,25 @@
+# Migration: Fill servis_kaydi.sure_asimi_tarihi in SQL
+# -*- coding: utf-8 -*-
+
+
+def migrate(cr, version):
+    """Süre aşımı tarihini ORM compute'una bırakmadan tek UPDATE ile doldur"""
+    cr.execute("""
+        SELECT value FROM ir_config_parameter
+         WHERE key = 'servis_takip.servis_sure_asimi_limiti'
+    """)
+    row = cr.fetchone()
+    try:
+        limit = int(row[0]) if row else 21
+    except (TypeError, ValueError):
+        limit = 21
+
+    cr.execute("""
+        ALTER TABLE servis_kaydi
+        ADD COLUMN IF NOT EXISTS sure_asimi_tarihi TIMESTAMP
+    """)
+    cr.execute("""
+        UPDATE servis_kaydi
+           SET sure_asimi_tarihi = kayit_tarihi + make_interval(days => %s)
+         WHERE kayit_tarihi IS NOT NULL
+    """, (limit,))
@@ -0,0 +1,37 @@
+# Migration: Fill numeric duration columns in SQL
+# -*- coding: utf-8 -*-
+
+
+def migrate(cr, version):
+    """Saniye cinsinden süre alanlarını ORM compute'una bırakmadan doldur"""
+    cr.execute("""
+        ALTER TABLE servis_kaydi
+        ADD COLUMN IF NOT EXISTS servis_suresi DOUBLE PRECISION
+    """)
+    cr.execute("""
+        UPDATE servis_kaydi
+           SET servis_suresi = CASE
+                   WHEN state IN ('teslim_edildi', 'iptal')
+                        AND kayit_tarihi IS NOT NULL AND teslim_tarihi IS NOT NULL
+                   THEN GREATEST(EXTRACT(EPOCH FROM teslim_tarihi - kayit_tarihi), 0)
+                   ELSE 0
+               END
+    """)
+
+    cr.execute("""
+        ALTER TABLE servis_durum_satiri
+        ADD COLUMN IF NOT EXISTS gecen_sure_saniye DOUBLE PRECISION
+    """)
+    cr.execute("""
+        UPDATE servis_durum_satiri
+           SET gecen_sure_saniye = COALESCE(EXTRACT(EPOCH FROM bitis_tarihi - tarih), 0)
+    """)
+
+    cr.execute("""
+        ALTER TABLE servis_islem_satiri
+        ADD COLUMN IF NOT EXISTS gecen_sure_saniye DOUBLE PRECISION
+    """)
+    cr.execute("""
+        UPDATE servis_islem_satiri
+           SET gecen_sure_saniye = COALESCE(GREATEST(EXTRACT(EPOCH FROM bitis_tarihi - tarih), 0), 0)
+    """)
@@ -7,4 +7,7 @@ from . import settings
 from . import ozellestirme
 from . import ozel_notebook_satiri
 from . import res_partner_extension
+from . import ir_sequence
+from . import ir_actions_report
+from . import ir_attachment
 from . import dashboard
\ No newline at end of file
@@ -1,46 +1,164 @@
 from odoo import models, fields, api
+from datetime import timedelta
 import logging
+from collections import OrderedDict
 from io import BytesIO
 import base64
+import hashlib
+import threading
 
 _logger = logging.getLogger(__name__)
 
+# 'code128' genellikle seri numaraları için en uygunudur
+BARKOD_SEMBOLOJI = 'code128'
+# Barkodun altındaki yazıyı ImageWriter eklemesin diye 'display_value': False
+BARKOD_SECENEKLERI = {
+    'module_height': 18.0,
+    'module_width': 0.4,
+    'quiet_zone': 1.0,
+    'display_value': False,
+}
+BARKOD_MIMETYPE = {'png': 'image/png', 'svg': 'image/svg+xml'}
+# Üretilen barkodların saklandığı ekler bu model adıyla işaretlenir
+BARKOD_EK_MODELI = 'barkod.etiketi.mixin'
+BARKOD_ONBELLEK_BOYUTU = 2048
+# Bu kadar gün kullanılmayan barkod ekleri temizlik cron'u ile silinir
+BARKOD_EK_SAKLAMA_GUNU = 30
+
+# Süreç içi LRU: (seri_no, semboloji, seçenekler, format) -> base64
+_barkod_onbellegi = OrderedDict()
+_barkod_kilidi = threading.Lock()
+_barkod_modulu = []
+
+
+def _barkod_kutuphanesi():
+    """python-barcode ilk kullanımda yüklenir; paket yoksa None (uyarı bir kez)"""
+    if not _barkod_modulu:
+        try:
+            import barcode
+        except ImportError:
+            _logger.warning("python-barcode paketi bulunamadı. Barkod üretimi devre dışı.")
+            barcode = None
+        _barkod_modulu.append(barcode)
+    return _barkod_modulu[0]
+
+
+def _barkod_anahtari(seri_no, semboloji, secenekler, format):
+    return (seri_no, semboloji, tuple(sorted(secenekler.items())), format)
+
+
+def _barkod_ek_adi(anahtar):
+    ozet = hashlib.sha1(repr(anahtar).encode()).hexdigest()
+    return 'barkod_%s.%s' % (ozet, anahtar[3])
+
+
+def _onbellekten_al(anahtar):
+    with _barkod_kilidi:
+        veri = _barkod_onbellegi.get(anahtar)
+        if veri is not None:
+            _barkod_onbellegi.move_to_end(anahtar)
+        return veri
+
+
+def _onbellege_yaz(anahtar, veri):
+    with _barkod_kilidi:
+        _barkod_onbellegi[anahtar] = veri
+        _barkod_onbellegi.move_to_end(anahtar)
+        while len(_barkod_onbellegi) > BARKOD_ONBELLEK_BOYUTU:
+            _barkod_onbellegi.popitem(last=False)
+
+
+def _barkod_uret(seri_no, semboloji, secenekler, format):
+    """Barkodu çizer ve base64 döndürür; SVG modunda PIL kullanılmaz"""
+    barcode = _barkod_kutuphanesi()
+    if not barcode:
+        return None
+    try:
+        from barcode.writer import ImageWriter, SVGWriter
+        secenekler = dict(secenekler)
+        if format == 'svg':
+            writer = SVGWriter()
+        else:
+            writer = ImageWriter()
+            secenekler['format'] = 'PNG'
+        output = BytesIO()
+        barcode.get_barcode_class(semboloji)(seri_no, writer=writer).write(output, options=secenekler)
+        return base64.b64encode(output.getvalue()).decode('utf-8')
+    except Exception as e:
+        _logger.warning(f"Barkod üretim hatası: {str(e)}")
+        return None
+
+
 class BarkodEtiketiMixin(models.AbstractModel):
     _name = 'barkod.etiketi.mixin'
     _description = 'Barkod Etiketi Mixin'
 
-    def get_barcode_base64(self):
+    def get_barcode_base64(self, format='png'):
         """Seri numarasından base64 formatında barkod oluşturur"""
-        if not hasattr(self, 'seri_no') or not self.seri_no:
+        if not self:
             return None
-        
-        try:
-            try:
-                import barcode
-                from barcode.writer import ImageWriter
-            except ImportError:
-                _logger.warning("python-barcode paketi bulunamadı. Barkod üretimi devre dışı.")
-                return None
-            
-            # Barkod üretimi
-            # 'code128' genellikle seri numaraları için en uygunudur
-            CODE = barcode.get_barcode_class('code128')
-            
-            # Görsel yazıcı ayarları
-            writer = ImageWriter()
-            barcode_instance = CODE(self.seri_no, writer=writer)
-            
-            output = BytesIO()
-            # Barkodun altındaki yazıyı ImageWriter eklemesin diye 'display_value': False
-            barcode_instance.write(output, options={
-                'module_height': 18.0,
-                'module_width': 0.4,
-                'quiet_zone': 1.0,
-                'display_value': False,
-                'format': 'PNG'
-            })
-            
-            return base64.b64encode(output.getvalue()).decode('utf-8')
-        except Exception as e:
-            _logger.warning(f"Barkod üretim hatası: {str(e)}")
-            return None
\ No newline at end of file
+        self.ensure_one()
+        return self.get_barcode_base64_toplu(format=format).get(self.id)
+
+    def get_barcode_base64_toplu(self, format='png', semboloji=BARKOD_SEMBOLOJI, secenekler=None):
+        """Kayıt kümesinin barkodları: {id: base64}; seri numarası olmayanlar None
+
+        Sıra: süreç içi LRU, sonra ek (ir.attachment) önbelleği, en son üretim.
+        Eksik ekler tek aramada bulunur, yeni üretilenler tek create ile yazılır.
+        Kullanılan eski eklerin write_date'i tek sorguyla yenilenir; böylece
+        temizlik cron'u sadece uzun süredir kullanılmayanları siler.
+        format: 'png' veya 'svg' (PIL gerektirmez).
+        """
+        secenekler = secenekler or BARKOD_SECENEKLERI
+        anahtarlar = {}
+        for record in self:
+            seri_no = 'seri_no' in record._fields and record.seri_no
+            anahtarlar[record.id] = seri_no and _barkod_anahtari(seri_no, semboloji, secenekler, format)
+
+        veriler = {}
+        eksik = {}
+        for anahtar in set(filter(None, anahtarlar.values())):
+            veri = _onbellekten_al(anahtar)
+            if veri is None:
+                eksik[anahtar] = _barkod_ek_adi(anahtar)
+            else:
+                veriler[anahtar] = veri
+
+        if eksik:
+            Attachment = self.env['ir.attachment'].sudo()
+            ekler = {ek.name: ek for ek in Attachment.search([
+                ('res_model', '=', BARKOD_EK_MODELI),
+                ('name', 'in', list(eksik.values())),
+            ])}
+            self._barkod_eklerini_tazele(ekler.values())
+            yeni_ekler = []
+            for anahtar, ad in eksik.items():
+                ek = ekler.get(ad)
+                veri = ek.datas.decode() if ek and ek.datas else _barkod_uret(*anahtar)
+                if veri is None:
+                    continue
+                if not ek:
+                    yeni_ekler.append({
+                        'name': ad,
+                        'type': 'binary',
+                        'datas': veri,
+                        'mimetype': BARKOD_MIMETYPE.get(format, 'image/png'),
+                        'res_model': BARKOD_EK_MODELI,
+                    })
+                veriler[anahtar] = veri
+                _onbellege_yaz(anahtar, veri)
+            if yeni_ekler:
+                Attachment.create(yeni_ekler)
+
+        return {rid: anahtar and veriler.get(anahtar) or None for rid, anahtar in anahtarlar.items()}
+
+    @api.model
+    def _barkod_eklerini_tazele(self, ekler):
+        """Saklama süresinin yarısından eski ekleri kullanılmış say (her baskıda yazmamak için)"""
+        sinir = fields.Datetime.now() - timedelta(days=BARKOD_EK_SAKLAMA_GUNU / 2)
+        eski_ids = [ek.id for ek in ekler if ek.write_date and ek.write_date < sinir]
+        if eski_ids:
+            self.env.cr.execute(
+                "UPDATE ir_attachment SET write_date = (now() at time zone 'UTC') WHERE id = ANY(%s)",
+                (eski_ids,)
+            )
@@ -1,5 +1,4 @@
-from odoo import models, fields, api, _
-from datetime import timedelta
+from odoo import models, fields, api, tools, _
 import re
 import random
 
@@ -42,6 +41,56 @@ class ServisDurumTanimi(models.Model):
         """0 ile 11 arasında rastgele bir renk indeksi döner"""
         return random.randint(1, 11)
 
+    # --- Durum Kayıt Defteri (process seviyesinde cache) ---
+    @api.model
+    @tools.ormcache()
+    def _durum_kayit_defteri(self):
+        """Sabit + ekstra durumlar: ((key, label, color, aktif), ...)
+
+        Selection listeleri, renkler ve etiketler buradan okunur; tanımlar
+        değiştiğinde create/write/unlink cache'i temizler.
+        """
+        kayitlar = [
+            (key, label, DURUM_RENK_MAP.get(key, 0), True)
+            for key, label in SERVIS_DURUM_SELECTION
+        ]
+        # Arşivlenmiş durumlar da renk/etiket için tutulur, selection'a girmez
+        ekstra_durumlar = self.sudo().with_context(active_test=False).search([])
+        for durum in ekstra_durumlar:
+            kayitlar.append((str(durum.id), durum.name, durum.color, durum.active))
+        return tuple(kayitlar)
+
+    @api.model
+    def _get_durum_selection(self):
+        """Selection alanları için [(key, label), ...] (sadece aktif durumlar)"""
+        return [(key, label) for key, label, _renk, aktif in self._durum_kayit_defteri() if aktif]
+
+    @api.model
+    def _get_durum_etiket_map(self):
+        """{key: label}"""
+        return {key: label for key, label, _renk, _aktif in self._durum_kayit_defteri()}
+
+    @api.model
+    def _get_durum_renk_map(self):
+        """{key: renk indeksi}"""
+        return {key: renk for key, _label, renk, _aktif in self._durum_kayit_defteri()}
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env.registry.clear_cache()
+        return records
+
+    def write(self, vals):
+        res = super().write(vals)
+        self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env.registry.clear_cache()
+        return res
+
     @api.onchange('name')
     def _onchange_name(self):
         """İsim girildiğinde Türkçe karakterleri düzeltip otomatik kod üretir"""
@@ -62,7 +111,8 @@ class ServisDurumSatiri(models.Model):
         'servis.kaydi', 
         string='Servis Kaydı',
         required=False,
-        ondelete='cascade'
+        ondelete='cascade',
+        index=True
     )
 
     # Many2one üzerinden seçim yaparak hem sabitleri hem eklenenleri yönetiriz
@@ -82,14 +132,8 @@ class ServisDurumSatiri(models.Model):
 
     def _get_durum_listesi(self):
         """Mevcut Selection listesi ile veritabanındaki yeni durumları birleştirir"""
-        # Önce koddaki sabit listeyi alalım
-        selection = list(SERVIS_DURUM_SELECTION)
-        # Veritabanına kullanıcı tarafından eklenenleri çekelim
-        ekstra_durumlar = self.env['servis.durum.tanimi'].search([])
-        for durum in ekstra_durumlar:
-            # Eğer kodda olmayan bir key/isim ise listeye ekle
-            selection.append((str(durum.id), durum.name))
-        return selection
+        # Sabit liste + kullanıcı durumları (cache'li kayıt defterinden)
+        return self.env['servis.durum.tanimi']._get_durum_selection()
 
     ariza_tanimi_id = fields.Many2one(
         'servis.ariza.tanimi', 
@@ -117,10 +161,18 @@ class ServisDurumSatiri(models.Model):
         copy=False
     )
     
+    gecen_sure_saniye = fields.Float(
+        string='Toplam Süre (sn)',
+        compute='_compute_gecen_sure_saniye',
+        store=True,
+        copy=False,
+        # Açık satırlar 0 tutar; ortalamalar _durum_bazli_ortalama_sureler ile kapanmış satırlardan alınır
+        aggregator=False
+    )
+    # Sadece gösterim içindir; durum bazlı ortalamalar gecen_sure_saniye üzerinden alınır
     gecen_sure = fields.Char(
         string='Toplam Süre',
         compute='_compute_gecen_sure',
-        store=True,
         copy=False
     )
     
@@ -128,16 +180,33 @@ class ServisDurumSatiri(models.Model):
     tablo_duzenle = fields.Boolean(related='servis_kaydi_id.tablo_duzenle', store=False)
     
     @api.depends('tarih', 'bitis_tarihi')
+    def _compute_gecen_sure_saniye(self):
+        for record in self:
+            if record.tarih and record.bitis_tarihi:
+                record.gecen_sure_saniye = (record.bitis_tarihi - record.tarih).total_seconds()
+            else:
+                record.gecen_sure_saniye = 0.0
+
+    @api.depends('tarih', 'bitis_tarihi', 'gecen_sure_saniye')
     def _compute_gecen_sure(self):
         for record in self:
             record.gecen_sure = False
             if record.tarih and record.bitis_tarihi:
-                delta = record.bitis_tarihi - record.tarih
-                days = delta.days
-                hours, remainder = divmod(delta.seconds, 3600)
+                days, remainder = divmod(int(record.gecen_sure_saniye), 86400)
+                hours, remainder = divmod(remainder, 3600)
                 minutes, _ = divmod(remainder, 60)
                 record.gecen_sure = f"{days} Gün {hours} Saat {minutes} Dakika"
 
+    @api.model
+    def _durum_bazli_ortalama_sureler(self, domain=None):
+        """Kapanmış durum satırlarının durum bazında ortalama süreleri: {state: saniye}"""
+        gruplar = self._read_group(
+            (domain or []) + [('bitis_tarihi', '!=', False)],
+            groupby=['state'],
+            aggregates=['gecen_sure_saniye:avg'],
+        )
+        return {state: ortalama or 0.0 for state, ortalama in gruplar}
+
     @api.model_create_multi
     def create(self, vals_list):
         current_employee = self.env.user.employee_id
@@ -169,35 +238,71 @@ class ServisDurumSatiri(models.Model):
 
         # Veritabanına yazma işlemi
         records = super(ServisDurumSatiri, self).create(vals_list)
-        
-        # Yazma sonrası işlemler
-        for record in records:
-            # Ana kaydın durumunu satırdaki durumla eşitle
-            if record.servis_kaydi_id and record.state:
-                # write metodu veritabanına kalıcı yazar
-                record.servis_kaydi_id.write({'state': record.state})
-
-            # Tarihleri zincirleme güncelleme mantığı (senin mevcut kodun)
-            onceki_satirlar = self.search([
-                ('servis_kaydi_id', '=', record.servis_kaydi_id.id),
-                ('id', '!=', record.id),
-                ('tarih', '<', record.tarih),
-                ('bitis_tarihi', '=', False) 
-            ], order='tarih desc', limit=1)
-            
-            if onceki_satirlar:
-                onceki_satirlar.write({'bitis_tarihi': record.tarih - timedelta(seconds=1)})
-                
+
+        # Yazma sonrası işlemler: önce önceki satırlar kapatılır, sonra ana kayıtlar eşitlenir
+        records._onceki_satirlari_kapat()
+        records._servis_durumlarini_esitle()
         return records
 
     def write(self, vals):
         res = super(ServisDurumSatiri, self).write(vals)
         if 'state' in vals:
-            for record in self:
-                if record.servis_kaydi_id:
-                    record.servis_kaydi_id.write({'state': record.state})
+            self._servis_durumlarini_esitle()
         return res
 
+    def _onceki_satirlari_kapat(self):
+        """Yeni satırlardan hemen önceki açık satırları tek UPDATE ile kapatır
+
+        Aynı servis kaydının açık satırları tarihe göre sıralanır; ardından yeni
+        satırlardan biri gelen ve ondan daha eski olan açık satır, yeni satırın
+        başlangıcından bir saniye önce biter. Aynı partide bir kayda birden fazla
+        satır eklenirse zincir de tek seferde kurulur.
+        """
+        if not self:
+            return
+        self.flush_model(['servis_kaydi_id', 'tarih', 'bitis_tarihi'])
+        self.env.cr.execute("""
+            UPDATE servis_durum_satiri ds
+               SET bitis_tarihi = sirali.sonraki_tarih - interval '1 second'
+              FROM (
+                    SELECT id, tarih,
+                           LEAD(id) OVER w AS sonraki_id,
+                           LEAD(tarih) OVER w AS sonraki_tarih
+                      FROM servis_durum_satiri
+                     WHERE servis_kaydi_id IN (
+                               SELECT servis_kaydi_id FROM servis_durum_satiri WHERE id IN %(ids)s
+                           )
+                       AND bitis_tarihi IS NULL
+                    WINDOW w AS (PARTITION BY servis_kaydi_id ORDER BY tarih, id)
+                   ) sirali
+             WHERE ds.id = sirali.id
+               AND sirali.sonraki_id IN %(ids)s
+               AND sirali.sonraki_tarih > sirali.tarih
+         RETURNING ds.id
+        """, {'ids': tuple(self.ids)})
+        kapatilanlar = self.browse([row[0] for row in self.env.cr.fetchall()])
+        if kapatilanlar:
+            # Süre alanları (gecen_sure_saniye ve bağımlıları) ORM üzerinden yeniden hesaplanır
+            kapatilanlar.invalidate_recordset(['bitis_tarihi'])
+            kapatilanlar.modified(['bitis_tarihi'])
+
+    def _servis_durumlarini_esitle(self):
+        """Ana kayıtların durumunu son satırın durumuyla eşitler
+
+        Her servis kaydı bir kez yazılır (partideki son satır kazanır) ve kayıtlar
+        hedef duruma göre gruplanır; böylece kayıt başına tek takip mesajı oluşur.
+        """
+        hedefler = {}
+        for record in self:
+            if record.servis_kaydi_id and record.state:
+                hedefler[record.servis_kaydi_id] = record.state
+        gruplar = {}
+        for servis_kaydi, state in hedefler.items():
+            gruplar.setdefault(state, self.env['servis.kaydi'])
+            gruplar[state] |= servis_kaydi
+        for state, servis_kayitlari in gruplar.items():
+            servis_kayitlari.write({'state': state})
+
     def action_tabloyu_ac_popup(self):
         self.ensure_one()
         self.servis_kaydi_id.write({'tablo_duzenle': True})
@@ -1,6 +1,19 @@
 from odoo import models, fields, api, _
 from datetime import timedelta
 
+
+def sure_metni(saniye):
+    """Saniye cinsinden süreyi '2 Gün 3 Saat 15 Dakika' biçiminde yazar (sıfır parçalar atlanır)"""
+    days, kalan = divmod(int(saniye or 0), 86400)
+    hours, kalan = divmod(kalan, 3600)
+    minutes = kalan // 60
+    parts = []
+    if days: parts.append(f"{days} Gün")
+    if hours: parts.append(f"{hours} Saat")
+    if minutes: parts.append(f"{minutes} Dakika")
+    return " ".join(parts) if parts else "0 Dakika"
+
+
 class ServisIslemTipi(models.Model):
     _name = 'servis.islem.tipi'
     _description = 'Servis İşlem Tipi Tanımları'
@@ -17,7 +30,8 @@ class ServisIslemSatiri(models.Model):
         'servis.kaydi', 
         string='Servis Kaydı', 
         required=True, 
-        ondelete='cascade'
+        ondelete='cascade',
+        index=True
     )
     islem_tipi_id = fields.Many2one('servis.islem.tipi', string='İşlem Tipi')
     tarih = fields.Datetime(
@@ -26,10 +40,18 @@ class ServisIslemSatiri(models.Model):
         readonly=True 
     )
     bitis_tarihi = fields.Datetime(string='Bitiş Tarihi')
+    gecen_sure_saniye = fields.Float(
+        string='Toplam Süre (sn)',
+        compute='_compute_gecen_sure_saniye',
+        store=True,
+        readonly=True,
+        # Açık satırlar 0 tutar; gruplu ortalama açık satırlarla aşağı çekilmesin
+        aggregator=False
+    )
+    # Sadece gösterim içindir; raporlama ve ortalamalar gecen_sure_saniye üzerinden yapılır
     gecen_sure = fields.Char(
         string='Toplam Süre', 
         compute='_compute_gecen_sure', 
-        store=True,
         readonly=True
     )
     aciklama = fields.Text(string='Açıklama / Not')
@@ -45,27 +67,23 @@ class ServisIslemSatiri(models.Model):
     tablo_duzenle = fields.Boolean(related='servis_kaydi_id.tablo_duzenle', store=False)
 
     @api.depends('tarih', 'bitis_tarihi')
-    def _compute_gecen_sure(self):
+    def _compute_gecen_sure_saniye(self):
         for record in self:
-            record.gecen_sure = False
             if record.tarih and record.bitis_tarihi:
-                start_dt = fields.Datetime.from_string(record.tarih)
-                end_dt = fields.Datetime.from_string(record.bitis_tarihi)
-                if end_dt < start_dt:
-                    record.gecen_sure = "Hata: Bitiş < Başlangıç"
-                    continue
-                delta = end_dt - start_dt
-                days = delta.days
-                seconds = delta.seconds
-                hours = seconds // 3600
-                minutes = (seconds % 3600) // 60
-                parts = []
-                if days: parts.append(f"{days} Gün")
-                if hours: parts.append(f"{hours} Saat")
-                if minutes: parts.append(f"{minutes} Dakika")
-                record.gecen_sure = " ".join(parts) if parts else "0 Dakika"
+                # Bitiş < Başlangıç hatalı girişleri ortalamaları bozmasın
+                record.gecen_sure_saniye = max((record.bitis_tarihi - record.tarih).total_seconds(), 0.0)
             else:
+                record.gecen_sure_saniye = 0.0
+
+    @api.depends('tarih', 'bitis_tarihi', 'gecen_sure_saniye')
+    def _compute_gecen_sure(self):
+        for record in self:
+            if not (record.tarih and record.bitis_tarihi):
                 record.gecen_sure = False
+            elif record.bitis_tarihi < record.tarih:
+                record.gecen_sure = "Hata: Bitiş < Başlangıç"
+            else:
+                record.gecen_sure = sure_metni(record.gecen_sure_saniye)
                 
     @api.model_create_multi
     def create(self, vals_list):
@@ -1,12 +1,17 @@
 from odoo import models, fields, api, _
 from odoo.exceptions import ValidationError, UserError
-from datetime import date, datetime
+from odoo.tools import split_every, SQL
+from datetime import date, datetime, timedelta
 import logging
-from .servis_durum import SERVIS_DURUM_SELECTION, DURUM_RENK_MAP
 from dateutil.relativedelta import relativedelta
+from .servis_islem import sure_metni
+from ..termal_etiket import TERMAL_CIZICILER
 
 _logger = logging.getLogger(__name__)
 
+# Tüm kayıtların toplam hesaplamasında işlenen son kaydın id'si; boşsa bekleyen iş yok
+TOPLAM_HESAPLAMA_PARAM = 'servis_takip.toplam_hesaplama_son_id'
+
 class ServisKaydi(models.Model):
     _name = 'servis.kaydi'
     _inherit = ['mail.thread', 'mail.activity.mixin', 'barkod.etiketi.mixin']
@@ -38,13 +43,8 @@ class ServisKaydi(models.Model):
 
     def _get_durum_listesi(self):
         """Koddaki 8 ana durum + Kullanıcının eklediği yeni durumlar"""
-        selection = list(SERVIS_DURUM_SELECTION)
-        # Veritabanındaki özel durumları çek (ID'yi key, Name'i value olarak ekle)
-        ekstra_durumlar = self.env['servis.durum.tanimi'].sudo().search([])
-        for durum in ekstra_durumlar:
-            # Mevcut kodlarla karışmaması için ID'yi string olarak key yapıyoruz
-            selection.append((str(durum.id), durum.name))
-        return selection
+        # Ekstra durumların key'i ID'nin string hali (kayıt defteri cache'li)
+        return self.env['servis.durum.tanimi']._get_durum_selection()
 
     color = fields.Integer(string='Durum Rengi', compute='_compute_color', store=True)
     state_badge_css = fields.Char(string='Durum Badge CSS', compute='_compute_state_badge_css', store=True)
@@ -75,6 +75,7 @@ class ServisKaydi(models.Model):
     notlar_ids = fields.One2many('servis.kaydi.notlar', 'servis_kaydi_id', string='Notlar', copy=True)
     aksesuar_ids = fields.One2many('servis.kaydi.aksesuar', 'servis_kaydi_id', string='Aksesuarlar', copy=True)
     deger_okuma_ids = fields.One2many('servis.kaydi.deger.okuma', 'servis_kaydi_id', string='Değer Okuma', copy=True)
+    form_gonderim_ids = fields.One2many('servis.form.gonderim', 'servis_kaydi_id', string='Form Gönderimleri', copy=False)
     kargolar_satiri_ids = fields.One2many('servis.kaydi.kargolar', 'servis_kaydi_id', string='Kargolar', copy=True)
     kargolar_toplam_tutar = fields.Monetary(string='Kargolar Toplam Tutar', compute='_compute_kargolar_toplam', store=False, currency_field='company_currency_id')
     dokuman_yukle_ids = fields.One2many('servis.kaydi.dokuman', 'servis_kaydi_id', string='Dokümanlar', copy=True)
@@ -167,19 +168,6 @@ class ServisKaydi(models.Model):
     def _compute_ozel_alan_degerleri(self):
         """Her özel alan için değerleri işle (alanları tuple yaparak özet oluştur)"""
         for record in self:
-            # Özelleştirme ayarlarını al
-            ozellestirme = self.env['servis.ozellestirme'].get_ozellestirme()
-            
-            # Alan isimleri (listede görünen adlandırma)
-            alan_adlari = {
-                'alan1': ozellestirme.ozel_alan_1_liste_adi or 'Özel Alan 1',
-                'alan2': ozellestirme.ozel_alan_2_liste_adi or 'Özel Alan 2',
-                'alan3': ozellestirme.ozel_alan_3_liste_adi or 'Özel Alan 3',
-                'alan4': ozellestirme.ozel_alan_4_liste_adi or 'Özel Alan 4',
-                'alan5': ozellestirme.ozel_alan_5_liste_adi or 'Özel Alan 5',
-                'alan6': ozellestirme.ozel_alan_6_liste_adi or 'Özel Alan 6',
-            }
-            
             # Notebook satırlarından değerleri topla
             nilai_dict = {'alan1': [], 'alan2': [], 'alan3': [], 'alan4': [], 'alan5': [], 'alan6': []}
             
@@ -199,24 +187,12 @@ class ServisKaydi(models.Model):
     def fields_get(self, allfields=None, attributes=None):
         """Özel alan sütun başlıklarını dinamik olarak güncelle"""
         result = super().fields_get(allfields, attributes)
-        
-        # Özelleştirme ayarlarını al
-        ozellestirme = self.env['servis.ozellestirme'].get_ozellestirme()
-        
-        # Computed field'ların string property'sini dinamik olarak ayarla
-        if 'ozel_alan_1_degeri' in result:
-            result['ozel_alan_1_degeri']['string'] = ozellestirme.ozel_alan_1_liste_adi or 'Özel Alan 1'
-        if 'ozel_alan_2_degeri' in result:
-            result['ozel_alan_2_degeri']['string'] = ozellestirme.ozel_alan_2_liste_adi or 'Özel Alan 2'
-        if 'ozel_alan_3_degeri' in result:
-            result['ozel_alan_3_degeri']['string'] = ozellestirme.ozel_alan_3_liste_adi or 'Özel Alan 3'
-        if 'ozel_alan_4_degeri' in result:
-            result['ozel_alan_4_degeri']['string'] = ozellestirme.ozel_alan_4_liste_adi or 'Özel Alan 4'
-        if 'ozel_alan_5_degeri' in result:
-            result['ozel_alan_5_degeri']['string'] = ozellestirme.ozel_alan_5_liste_adi or 'Özel Alan 5'
-        if 'ozel_alan_6_degeri' in result:
-            result['ozel_alan_6_degeri']['string'] = ozellestirme.ozel_alan_6_liste_adi or 'Özel Alan 6'
-        
+
+        # Başlıklar özelleştirme kaydından önbellekli olarak gelir
+        for fname, etiket in self.env['servis.ozellestirme']._get_liste_etiketleri().items():
+            if fname in result:
+                result[fname]['string'] = etiket
+
         return result
 
     @api.depends('garanti_bitis')
@@ -283,33 +259,101 @@ class ServisKaydi(models.Model):
     kayit_tarihi = fields.Datetime(string='Ürün Giriş Tarihi', required=True, default=fields.Datetime.now, readonly=True, copy=False)
     teslim_tarihi = fields.Datetime(string='Teslim Edildiği Tarih', compute='_compute_teslim_tarihi', store=True, readonly=True)
     teslim_edildi_by_id = fields.Many2one('res.users', string='Teslim Eden Kullanıcı', readonly=True, copy=False)
+    # Sadece gösterim içindir; ortalama ve yüzdelikler servis_suresi üzerinden hesaplanır
     serviste_gecen_sure = fields.Char(string='Serviste Geçen Süre', compute='_compute_serviste_gecen_sure')
-    sure_asimi_var = fields.Boolean(compute="_compute_sure_asimi", store=False)
+    servis_suresi = fields.Float(
+        string='Servis Süresi (sn)',
+        compute='_compute_servis_suresi',
+        store=True,
+        copy=False,
+        # Açık kayıtlar 0 tuttuğu için düz ortalama yanıltıcıdır; ortalama ve
+        # yüzdelikler sadece kapanmış kayıtlar üzerinden alınır
+        aggregator=False,
+        help='Kapanmış (teslim edildi / iptal) kayıtlarda giriş ile teslim arasındaki süre, açık kayıtlarda 0'
+    )
+    sure_asimi_tarihi = fields.Datetime(
+        string='Süre Aşımı Tarihi',
+        compute='_compute_sure_asimi_tarihi',
+        store=True,
+        index=True,
+        copy=False,
+        help='Ürün giriş tarihi + ayarlardaki servis süre aşımı limiti'
+    )
+    sure_asimi_var = fields.Boolean(string='Süre Aşımı Var', compute="_compute_sure_asimi", search='_search_sure_asimi_var', store=False)
     sure_asimi_mesaji = fields.Char(string='Süre Aşımı Mesajı', compute='_compute_sure_asimi_mesaji', store=False)
 
-    def _compute_sure_asimi(self):
-        # Ayarlardan servis süre aşımı limitini al (default: 21 gün)
-        sure_asimi_limiti = int(self.env['ir.config_parameter'].sudo().get_param(
+    @api.model
+    def _get_sure_asimi_limiti(self):
+        """Ayarlardan servis süre aşımı limitini al (default: 21 gün)"""
+        return int(self.env['ir.config_parameter'].sudo().get_param(
             'servis_takip.servis_sure_asimi_limiti',
             default='21'
         ))
-        
+
+    @api.depends('kayit_tarihi')
+    def _compute_sure_asimi_tarihi(self):
+        sure_asimi_limiti = self._get_sure_asimi_limiti()
         for rec in self:
-            if rec.kayit_tarihi and rec.state not in ['teslim_edildi', 'iptal']:
-                # Giriş tarihinden bugüne ne kadar zaman geçtiğini hesapla
-                fark = datetime.now() - rec.kayit_tarihi
-                # Eğer geçen süre ayarlanan limitten büyükse True dön
-                rec.sure_asimi_var = fark.days >= sure_asimi_limiti
-            else:
-                rec.sure_asimi_var = False
+            rec.sure_asimi_tarihi = rec.kayit_tarihi + timedelta(days=sure_asimi_limiti) if rec.kayit_tarihi else False
+
+    @api.model
+    def _sure_asimi_tarihlerini_guncelle(self):
+        """Limit değiştiğinde tüm süre aşımı tarihlerini tek UPDATE ile yeniden hesapla"""
+        self.env.flush_all()
+        self.env.cr.execute("""
+            UPDATE servis_kaydi
+               SET sure_asimi_tarihi = kayit_tarihi + make_interval(days => %s)
+             WHERE kayit_tarihi IS NOT NULL
+        """, (self._get_sure_asimi_limiti(),))
+        self.invalidate_model(['sure_asimi_tarihi'])
+
+    @api.depends('state', 'sure_asimi_tarihi')
+    def _compute_sure_asimi(self):
+        simdi = fields.Datetime.now()
+        for rec in self:
+            # Kapanmamış ve süre aşımı tarihi geçmiş kayıtlar (_search_sure_asimi_var ile aynı koşul)
+            rec.sure_asimi_var = bool(
+                rec.state not in ['teslim_edildi', 'iptal']
+                and rec.sure_asimi_tarihi
+                and rec.sure_asimi_tarihi <= simdi
+            )
+
+    def _search_sure_asimi_var(self, operator, value):
+        """Süre aşımını SQL koşuluna çevir (liste filtreleri ve dashboard sayımları için)"""
+        if operator == '=':
+            aranan = {bool(value)}
+        elif operator == '!=':
+            aranan = {not value}
+        elif operator == 'in':
+            aranan = {bool(v) for v in value}
+        elif operator == 'not in':
+            aranan = {True, False} - {bool(v) for v in value}
+        else:
+            raise UserError(_("Süre aşımı alanında desteklenmeyen operatör: %s") % operator)
+
+        if aranan == {True, False}:
+            return []
+        if not aranan:
+            return [('id', '=', False)]
+
+        simdi = fields.Datetime.now()
+        kapali_durumlar = ['teslim_edildi', 'iptal']
+        if True in aranan:
+            return [
+                ('state', 'not in', kapali_durumlar),
+                ('sure_asimi_tarihi', '<=', simdi),
+            ]
+        return [
+            '|', '|',
+            ('state', 'in', kapali_durumlar),
+            ('sure_asimi_tarihi', '=', False),
+            ('sure_asimi_tarihi', '>', simdi),
+        ]
 
     @api.depends('sure_asimi_var')
     def _compute_sure_asimi_mesaji(self):
         """Ayarlardan gelen limite göre dinamik mesaj oluştur"""
-        sure_asimi_limiti = int(self.env['ir.config_parameter'].sudo().get_param(
-            'servis_takip.servis_sure_asimi_limiti',
-            default='21'
-        ))
+        sure_asimi_limiti = self._get_sure_asimi_limiti()
         
         for rec in self:
             if rec.sure_asimi_var:
@@ -375,19 +419,10 @@ class ServisKaydi(models.Model):
 
     @api.depends('state')
     def _compute_color(self):
+        # Sabit ve ekstra durumların renkleri tek haritada
+        renk_map = self.env['servis.durum.tanimi']._get_durum_renk_map()
         for record in self:
-            # Önce koddaki renk haritasına bak
-            color = DURUM_RENK_MAP.get(record.state, 0)
-            if not color and record.state:
-                # Eğer koddaki listede yoksa, veritabanındaki tanımdan rengi çek
-                try:
-                    # Eğer state bir ID ise (ekstra durumdur)
-                    durum_id = int(record.state)
-                    ekstra = self.env['servis.durum.tanimi'].sudo().browse(durum_id)
-                    color = ekstra.color
-                except:
-                    color = 0
-            record.color = color
+            record.color = renk_map.get(record.state, 0)
 
     # Odoo renk indekslerinin hex değerleri
     COLOR_HEX_MAP = {
@@ -415,23 +450,45 @@ class ServisKaydi(models.Model):
             record.state_badge_css = f"background-color: {hex_color} !important; color: white !important;"
 
     @api.depends('kayit_tarihi', 'state', 'teslim_tarihi')
+    def _compute_servis_suresi(self):
+        for record in self:
+            if record.kayit_tarihi and record.teslim_tarihi and record.state in ('teslim_edildi', 'iptal'):
+                record.servis_suresi = max((record.teslim_tarihi - record.kayit_tarihi).total_seconds(), 0.0)
+            else:
+                record.servis_suresi = 0.0
+
+    @api.depends('kayit_tarihi', 'state', 'teslim_tarihi', 'servis_suresi')
     def _compute_serviste_gecen_sure(self):
         now = fields.Datetime.now()
         for record in self:
-            if record.kayit_tarihi:
-                end = record.teslim_tarihi if record.state in ('teslim_edildi', 'iptal') and record.teslim_tarihi else now
-                delta = end - record.kayit_tarihi
-                days = delta.days
-                hours = delta.seconds // 3600
-                minutes = (delta.seconds % 3600) // 60
-                res = []
-                if days > 0: res.append(f"{days} Gün")
-                if hours > 0: res.append(f"{hours} Saat")
-                if minutes > 0: res.append(f"{minutes} Dakika")
-                record.serviste_gecen_sure = " ".join(res) if res else "0 Dakika"
+            if record.state in ('teslim_edildi', 'iptal') and record.teslim_tarihi:
+                record.serviste_gecen_sure = sure_metni(record.servis_suresi)
+            elif record.kayit_tarihi:
+                # Açık kayıtlarda süre anlık hesaplanır
+                record.serviste_gecen_sure = sure_metni((now - record.kayit_tarihi).total_seconds())
             else:
                 record.serviste_gecen_sure = "0 Dakika"
 
+    @api.model
+    def _servis_suresi_yuzdelikleri(self, domain=None, oranlar=(0.5, 0.9)):
+        """Kapanmış kayıtların servis süresi yüzdelikleri (saniye): {oran: süre}
+
+        read_group yüzdelik desteklemediği için percentile_cont ile tek sorguda
+        hesaplanır; domain ve kayıt kuralları _search üzerinden uygulanır.
+        """
+        oranlar = list(oranlar)
+        query = self._search((domain or []) + [
+            ('state', 'in', ['teslim_edildi', 'iptal']),
+            ('teslim_tarihi', '!=', False),
+        ])
+        self.env.cr.execute(query.select(SQL(
+            "percentile_cont(%s::float8[]) WITHIN GROUP (ORDER BY %s)",
+            oranlar,
+            SQL.identifier(self._table, 'servis_suresi'),
+        )))
+        degerler = self.env.cr.fetchone()[0] or [0.0] * len(oranlar)
+        return dict(zip(oranlar, degerler))
+
     @api.depends('state', 'durum_satirlari.tarih') 
     def _compute_teslim_tarihi(self): 
         for record in self: 
@@ -451,25 +508,95 @@ class ServisKaydi(models.Model):
             'teknik_rapor_satirlari.ornek_miktar',
             'teknik_rapor_satirlari.ornek_birim_fiyat')
     def _compute_toplamlar(self):
+        # Tüm kayıtların satırları tek seferde, vergi imzasına göre gruplanarak hesaplanır
+        sonuclar = self.teknik_rapor_satirlari._vergi_sonuclarini_hesapla()
         for record in self:
             v_haric = 0.0
             v_toplam = 0.0
             for line in record.teknik_rapor_satirlari:
-                # Odoo'nun standart vergi hesaplama motoru
-                taxes = line.ornek_vergiler.compute_all(
-                    line.ornek_birim_fiyat, 
-                    currency=record.company_currency_id, 
-                    quantity=line.ornek_miktar, 
-                    product=line.ornek_urun_id, 
-                    partner=record.musteri_id
-                )
-                v_haric += taxes['total_excluded']
-                v_toplam += (taxes['total_included'] - taxes['total_excluded'])
+                haric, dahil = sonuclar[line]
+                v_haric += haric
+                v_toplam += (dahil - haric)
             
             record.vergi_haric_tutar = v_haric
             record.toplam_vergi = v_toplam
             record.genel_toplam = v_haric + v_toplam
 
+    def _toplamlari_yeniden_hesapla(self, parca_boyutu=1000):
+        """Vergi tanımları değiştikten sonra satır ve kayıt toplamlarını yeniden hesapla
+
+        Kayıtlar parça parça hesaplanıp veritabanına yazılır. Tüm kayıtlar için
+        _toplam_hesaplamasini_planla (cron) kullanılır.
+        """
+        ids = self.ids
+        Satir = self.env['servis.kaydi.teknik.rapor.satir']
+        for parca_ids in split_every(parca_boyutu, ids):
+            kayitlar = self.browse(parca_ids)
+            self.env.add_to_compute(Satir._fields['ornek_ara_toplam'], kayitlar.teknik_rapor_satirlari)
+            for alan in ('vergi_haric_tutar', 'toplam_vergi', 'genel_toplam'):
+                self.env.add_to_compute(self._fields[alan], kayitlar)
+            self.env.flush_all()
+            # Bellek şişmesin: her parçadan sonra cache'i boşalt
+            self.env.invalidate_all()
+        return len(ids)
+
+    @api.model
+    def _toplam_hesaplamasini_planla(self):
+        """Tüm kayıtların yeniden hesaplanmasını baştan başlatır ve cron'u tetikler"""
+        self.env['ir.config_parameter'].sudo().set_param(TOPLAM_HESAPLAMA_PARAM, '0')
+        self.env.ref('servis_takip.ir_cron_servis_toplamlari_yeniden_hesapla')._trigger()
+
+    @api.model
+    def _cron_toplamlari_yeniden_hesapla(self, parca_boyutu=1000):
+        """Planlanmış tam hesaplamayı id sırasıyla parça parça işler
+
+        Her parçadan sonra işlenen son id kaydedilip commit edilir; süre dolarsa
+        cron bir sonraki çalışmada kaldığı yerden devam eder.
+        """
+        param = self.env['ir.config_parameter'].sudo()
+        son_id = param.get_param(TOPLAM_HESAPLAMA_PARAM)
+        if not son_id:
+            return
+        son_id = int(son_id)
+        while True:
+            kayitlar = self.search([('id', '>', son_id)], order='id', limit=parca_boyutu)
+            if not kayitlar:
+                break
+            son_id = kayitlar.ids[-1]
+            kayitlar._toplamlari_yeniden_hesapla(parca_boyutu)
+            param.set_param(TOPLAM_HESAPLAMA_PARAM, str(son_id))
+            kalan = self.search_count([('id', '>', son_id)])
+            if not self.env['ir.cron']._commit_progress(len(kayitlar), remaining=kalan):
+                return
+        param.set_param(TOPLAM_HESAPLAMA_PARAM, '')
+        _logger.info("Servis kayıtlarının toplamları yeniden hesaplandı.")
+
+    def action_toplamlari_yeniden_hesapla(self):
+        """Seçili kayıtların toplamlarını hemen, seçim yoksa tümünü arka planda hesapla"""
+        if not self:
+            self._toplam_hesaplamasini_planla()
+            return {
+                'type': 'ir.actions.client',
+                'tag': 'display_notification',
+                'params': {
+                    'title': _('Planlandı'),
+                    'message': _('Tüm servis kayıtlarının toplamları arka planda yeniden hesaplanacak.'),
+                    'type': 'info',
+                    'sticky': False,
+                }
+            }
+        adet = self._toplamlari_yeniden_hesapla()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Başarılı'),
+                'message': _('%s servis kaydının toplamları yeniden hesaplandı.') % adet,
+                'type': 'success',
+                'sticky': False,
+            }
+        }
+
     @api.depends('company_id')
     def _compute_company_currency_id(self):
         for record in self:
@@ -498,7 +625,7 @@ class ServisKaydi(models.Model):
             'personel_id': p_id,
             'aciklama': aciklama,
         })
-        durum_adi = dict(SERVIS_DURUM_SELECTION).get(durum_kodu, durum_kodu)
+        durum_adi = self.env['servis.durum.tanimi']._get_durum_etiket_map().get(durum_kodu, durum_kodu)
         self.message_post(body=_(f"Durum değişti: **{durum_adi}**"))
         
     def _create_islem_satiri(self, islem_tipi_id, aciklama):
@@ -556,69 +683,95 @@ class ServisKaydi(models.Model):
                             % "\n• ".join(eksikler)
                         )
         
+        # 1. İsim atama: referans numaralarını tek seferde blok olarak ayır
+        isimsizler = [vals for vals in vals_list if vals.get('name', 'Yeni') == 'Yeni']
+        referanslar = self.env['ir.sequence']._next_by_code_blok('servis.kaydi.referans', len(isimsizler))
+        for vals, referans in zip(isimsizler, referanslar):
+            vals['name'] = referans or 'Yeni'
+
+        p_id = self.env.user.employee_id.id if self.env.user.employee_id else False
+        simdi = fields.Datetime.now()
         for vals in vals_list:
-            # 1. İsim atama
-            if vals.get('name', 'Yeni') == 'Yeni':
-                vals['name'] = self.env['ir.sequence'].next_by_code('servis.kaydi.referans') or 'Yeni'
-            
             # 2. Kritik Kontrol: Eğer durum_satirlari vals içinde hiç yoksa veya boşsa
             # (Sizin durumunuzda başta dolu gelip sonra boşalıyorsa vals içinden düşüyor demektir)
             if not vals.get('durum_satirlari'):
-                p_id = self.env.user.employee_id.id if self.env.user.employee_id else False
                 vals['durum_satirlari'] = [(0, 0, {
                     'state': 'kayit_yapildi',
-                    'tarih': fields.Datetime.now(),
+                    'tarih': simdi,
                     'aciklama': 'Servis kaydı oluşturuldu.',
                     'personel_id': p_id,
                 })]
                 
-        # Ana kaydı oluştur
+        # Ana kaydı oluştur (durum satırları da aynı create içinde toplu yazılır)
         records = super(ServisKaydi, self).create(vals_list)
         
         # 3. İKİNCİ GÜVENLİK KATI: Eğer üstteki işe yaramazsa (Veritabanına manuel yaz)
-        for rec in records:
-            if not rec.durum_satirlari:
-                self.env['servis.durum.satiri'].create({
-                    'servis_kaydi_id': rec.id,
-                    'state': 'kayit_yapildi',
-                    'aciklama': 'Servis kaydı oluşturuldu (Sistem Tarafından).',
-                    'personel_id': self.env.user.employee_id.id if self.env.user.employee_id else False,
-                })
+        eksik_durumlular = records.filtered(lambda r: not r.durum_satirlari)
+        if eksik_durumlular:
+            self.env['servis.durum.satiri'].create([{
+                'servis_kaydi_id': rec.id,
+                'state': 'kayit_yapildi',
+                'aciklama': 'Servis kaydı oluşturuldu (Sistem Tarafından).',
+                'personel_id': p_id,
+            } for rec in eksik_durumlular])
+
+        # 4. Ayar Kontrolü: Kayıt politikasına bak
+        if self._get_urun_parki_kayit_politikasi() == 'kayit_et':
+            records._urun_parkina_toplu_kayit()
+                
+        return records
 
-        # 3. Ayar Kontrolü: Kayıt politikasına bak
-        politikasi = self.env['ir.config_parameter'].sudo().get_param('servis_takip.urun_parki_kayit_politikasi', default='kayit_et')
+    @api.model
+    def create_toplu(self, vals_list, parca_boyutu=1000):
+        """Toplu servis kabulü (partner aktarımları için RPC giriş noktası)
 
-        if politikasi == 'kayit_et':
-            for rec in records:
-                # DÖRT KONTROL: Tür, Marka, Model ve Seri No dolu mu?
-                if rec.seri_no and rec.urun_turu_id and rec.urun_marka_id and rec.urun_modeli_id:
-                    
-                    # Ürün Parkı'nda bu dördünün birden eşleştiği bir kayıt var mı?
-                    mevcut = self.env['servis.urun'].search([
-                        ('serial_no', '=', rec.seri_no),
-                        ('tur_id', '=', rec.urun_turu_id.id),
-                        ('marka_id', '=', rec.urun_marka_id.id),
-                        ('model_id', '=', rec.urun_modeli_id.id)
-                    ], limit=1)
-
-                    if not mevcut:
-                        # Ürün Parkı'ndaki sequence kodunu kullanarak isim al
-                        # Not: 'servis.urun.sequence' kısmını kendi sequence kodunla değiştir
-                        urun_kodu = self.env['ir.sequence'].next_by_code('servis.urun.sequence') or 'YENI-URUN'
-                        
-                        self.env['servis.urun'].sudo().create({
-                            'name': urun_kodu, # Otomatik artan ürün kodu
-                            'musteri_id': rec.musteri_id.id,
-                            'tur_id': rec.urun_turu_id.id,
-                            'marka_id': rec.urun_marka_id.id,
-                            'model_id': rec.urun_modeli_id.id,
-                            'serial_no': rec.seri_no,
-                            'barcode': rec.barkod_no,
-                            'garanti_baslama': rec.garanti_baslama,
-                            'garanti_suresi': rec.garanti_suresi,
-                        })
-                
+        Kayıtlar `parca_boyutu` büyüklüğünde gruplar halinde create'e verilir;
+        her grup referans numaralarını, ürün parkı eşleşmelerini ve durum
+        satırlarını tek seferde işler.
+        """
+        records = self.browse()
+        for parca in split_every(parca_boyutu, vals_list, list):
+            records |= self.create(parca)
         return records
+
+    def _urun_parkina_toplu_kayit(self):
+        """Ürün Parkı'nda karşılığı olmayan kayıtlar için servis.urun satırlarını tek create ile oluştur"""
+        # DÖRT KONTROL: Tür, Marka, Model ve Seri No dolu mu?
+        adaylar = self.filtered(
+            lambda r: r.seri_no and r.urun_turu_id and r.urun_marka_id and r.urun_modeli_id
+        )
+        if not adaylar:
+            return self.env['servis.urun']
+
+        # Ürün Parkı'ndaki tüm eşleşmeleri tek sorguda çek
+        UrunParki = self.env['servis.urun']
+        bulunanlar = set(UrunParki._urun_parki_toplu_bul([
+            (rec.urun_turu_id.id, rec.urun_marka_id.id, rec.urun_modeli_id.id, rec.seri_no)
+            for rec in adaylar
+        ]))
+
+        yeni_urunler = []
+        for rec in adaylar:
+            anahtar = UrunParki._urun_parki_anahtari(
+                rec.urun_turu_id.id, rec.urun_marka_id.id, rec.urun_modeli_id.id, rec.seri_no
+            )
+            # Aynı parti içinde tekrar eden cihaz için ikinci kayıt açma
+            if anahtar in bulunanlar:
+                continue
+            bulunanlar.add(anahtar)
+            yeni_urunler.append({
+                'musteri_id': rec.musteri_id.id,
+                'tur_id': rec.urun_turu_id.id,
+                'marka_id': rec.urun_marka_id.id,
+                'model_id': rec.urun_modeli_id.id,
+                'serial_no': rec.seri_no,
+                'barcode': rec.barkod_no,
+                'garanti_baslama': rec.garanti_baslama,
+                'garanti_suresi': rec.garanti_suresi,
+            })
+
+        # Ürün kodları servis.urun.create içinde blok olarak atanır
+        return self.env['servis.urun'].sudo().create(yeni_urunler)
     
     def write(self, vals):
         # Eğer satırlarda bir oynama varsa tabloyu kilitle
@@ -738,6 +891,19 @@ class ServisKaydi(models.Model):
             'target': 'new',
         }
     
+    def _toplu_form_gonderim_engeli(self, form_tipleri):
+        """Toplu gönderimde bu kaydın atlanma nedeni; gönderilebiliyorsa False"""
+        self.ensure_one()
+        if not self.musteri_id:
+            return 'Müşteri seçilmemiş.'
+        if not self.musteri_id.email:
+            return 'Müşterinin e-posta adresi yok.'
+        if 'teslim' in form_tipleri and not self.rapor_parca_hizmet_ekle \
+                and not (self.teknisyen_notu or '').strip():
+            # action_teslim_formu_pdf ile aynı kural
+            return 'Teslim formu için teknisyen notu gerekli.'
+        return False
+
     def action_open_formu_gonder_wizard(self):
         """Form gönderme wizard'ını aç"""
         self.ensure_one()
@@ -835,16 +1001,12 @@ class ServisKaydi(models.Model):
             return
 
         # Ürün Parkı'nda (servis.urun) ara
-        domain = [
-            ('serial_no', '=', self.seri_no),
-            ('tur_id', '=', self.urun_turu_id.id)
-        ]
-        if self.urun_marka_id:
-            domain.append(('marka_id', '=', self.urun_marka_id.id))
-        if self.urun_modeli_id:
-            domain.append(('model_id', '=', self.urun_modeli_id.id))
-
-        mevcut_urun = self.env['servis.urun'].search(domain, limit=1)
+        mevcut_urun = self.env['servis.urun']._urun_parki_bul(
+            self.urun_turu_id.id,
+            self.seri_no,
+            marka_id=self.urun_marka_id.id,
+            model_id=self.urun_modeli_id.id,
+        )
 
         if mevcut_urun:
             # DURUM 1: Başka Müşteriye Ait (KESİN ENGEL)
@@ -1091,12 +1253,12 @@ class ServisKaydi(models.Model):
             raise UserError(_('Ürün parkına aktar işlemi için lütfen en az bir arıza tipi seçiniz.'))
         
         # Ürün parkında arama yap
-        urun_parki = self.env['servis.urun'].search([
-            ('tur_id', '=', self.urun_turu_id.id),
-            ('marka_id', '=', self.urun_marka_id.id),
-            ('model_id', '=', self.urun_modeli_id.id),
-            ('serial_no', '=', self.seri_no),
-        ], limit=1)
+        urun_parki = self.env['servis.urun']._urun_parki_bul(
+            self.urun_turu_id.id,
+            self.seri_no,
+            marka_id=self.urun_marka_id.id,
+            model_id=self.urun_modeli_id.id,
+        )
         
         if urun_parki:
             # Ürün parkında kayıtlı - müşteri kontrolü yap
@@ -1153,12 +1315,12 @@ class ServisKaydi(models.Model):
             return
         
         # Ürün parkında arama yap
-        urun_parki = self.env['servis.urun'].search([
-            ('tur_id', '=', self.urun_turu_id.id),
-            ('marka_id', '=', self.urun_marka_id.id),
-            ('model_id', '=', self.urun_modeli_id.id),
-            ('serial_no', '=', self.seri_no),
-        ], limit=1)
+        urun_parki = self.env['servis.urun']._urun_parki_bul(
+            self.urun_turu_id.id,
+            self.seri_no,
+            marka_id=self.urun_marka_id.id,
+            model_id=self.urun_modeli_id.id,
+        )
         
         if urun_parki:
             # Ürün parkında kayıtlı - güncelle
@@ -1195,3 +1357,40 @@ class ServisKaydi(models.Model):
             'target': 'new',
         }
 
+    def _etiket_alanlarini_yukle(self):
+        """Etikette kullanılan alanları (müşteri, model, arızalar) birkaç sorguda önceden yükler"""
+        self.fetch(['name', 'seri_no', 'kayit_tarihi', 'musteri_id', 'urun_modeli_id', 'ariza_detay_ids'])
+        self.musteri_id.fetch(['name', 'phone'])
+        self.urun_modeli_id.fetch(['name'])
+        self.ariza_detay_ids.fetch(['ariza_tanimi_id', 'musteri_notu'])
+        self.ariza_detay_ids.ariza_tanimi_id.fetch(['name'])
+
+    def _termal_etiket_verisi(self):
+        """report_barkod_etiketi ile aynı alanlar, termal_etiket çizicilerinin beklediği biçimde"""
+        self.ensure_one()
+        return {
+            'musteri': self.musteri_id.name,
+            'telefon': self.musteri_id.phone,
+            'seri_no': self.seri_no,
+            'model': self.urun_modeli_id.name,
+            'garantili': self.garanti_durumu == 'devam',
+            'tarih': self.kayit_tarihi.strftime('%d.%m.%Y') if self.kayit_tarihi else '',
+            'arizalar': [(ariza.ariza_tanimi_id.name, ariza.musteri_notu) for ariza in self.ariza_detay_ids],
+        }
+
+    def get_termal_etiket(self, dil='zpl'):
+        """Kayıtların etiketlerini yazıcı diliyle (zpl / epl) tek metin olarak döndürür"""
+        cizici = TERMAL_CIZICILER.get(dil)
+        if not cizici:
+            raise UserError(_("Desteklenmeyen etiket dili: %s") % dil)
+        self._etiket_alanlarini_yukle()
+        return ''.join(cizici(record._termal_etiket_verisi()) for record in self)
+
+    def action_termal_etiket_indir(self, dil='zpl'):
+        """Termal yazıcı etiketlerini (.zpl / .epl) indirir"""
+        return {
+            'type': 'ir.actions.act_url',
+            'url': '/servis_takip/etiket/%s?ids=%s' % (dil, ','.join(str(i) for i in self.ids)),
+            'target': 'self',
+        }
+
@@ -1,4 +1,5 @@
 from odoo import models, fields, api, _
+from collections import defaultdict
 import random
 
 class ServisArizaTanimi(models.Model):
@@ -12,7 +13,7 @@ class ServisArizaTanimi(models.Model):
 class ServisKaydiArizaDetay(models.Model):
     _name = 'servis.kaydi.ariza.detay'
     _description = 'Servis Kaydı Arıza Detayları'
-    servis_kaydi_id = fields.Many2one('servis.kaydi', string='Servis Kaydı', required=True, ondelete='cascade')
+    servis_kaydi_id = fields.Many2one('servis.kaydi', string='Servis Kaydı', required=True, ondelete='cascade', index=True)
     ariza_tanimi_id = fields.Many2one(
         'servis.ariza.tanimi', 
         string='Arıza Tipi', 
@@ -26,7 +27,7 @@ class ServisKaydiTeknikRaporSatir(models.Model):
     _description = 'Parça ve Hizmet Satırları'
     _order = 'sequence, id'
 
-    servis_kaydi_id = fields.Many2one('servis.kaydi', string='Servis Kaydı', required=True, ondelete='cascade')
+    servis_kaydi_id = fields.Many2one('servis.kaydi', string='Servis Kaydı', required=True, ondelete='cascade', index=True)
     sequence = fields.Integer(string='Sıra', default=10)
     
     ornek_tur = fields.Selection([
@@ -53,16 +54,50 @@ class ServisKaydiTeknikRaporSatir(models.Model):
     @api.depends('ornek_miktar', 'ornek_birim_fiyat', 'ornek_vergiler')
     def _compute_ara_toplam(self):
         """Satır bazında vergi hariç ara toplamı hesaplar."""
+        sonuclar = self._vergi_sonuclarini_hesapla()
+        for line in self:
+            line.ornek_ara_toplam = sonuclar[line][0]
+
+    def _vergi_sonuclarini_hesapla(self):
+        """Satırların vergi sonuçlarını toplu hesapla: {satır: (vergi_hariç, vergi_dahil)}
+
+        Satırlar (vergi seti, para birimi, fiyata dahil bayrakları) ile gruplanır.
+        Grup içinde aynı birim fiyat ve miktara sahip satırlar için compute_all
+        bir kez çağrılır. Python kodlu vergilerde ürün ve müşteri de imzaya girer.
+        """
+        gruplar = defaultdict(list)
         for line in self:
-            # compute_all metodunu kullanarak vergi hariç (total_excluded) tutarı alıyoruz
-            taxes = line.ornek_vergiler.compute_all(
-                line.ornek_birim_fiyat, 
-                quantity=line.ornek_miktar, 
-                currency=line.currency_id, 
-                product=line.ornek_urun_id, 
-                partner=line.servis_kaydi_id.musteri_id
+            vergiler = line.ornek_vergiler.sorted('id')
+            anahtar = (
+                tuple(vergiler.ids),
+                line.currency_id.id,
+                tuple(vergiler.mapped('price_include')),
             )
-            line.ornek_ara_toplam = taxes['total_excluded']
+            gruplar[anahtar].append(line)
+
+        sonuclar = {}
+        for satirlar in gruplar.values():
+            vergiler = satirlar[0].ornek_vergiler
+            para_birimi = satirlar[0].currency_id
+            vergi_tipleri = set(vergiler.mapped('amount_type')) | set(vergiler.children_tax_ids.mapped('amount_type'))
+            kod_vergisi = 'code' in vergi_tipleri
+
+            hesaplananlar = {}
+            for line in satirlar:
+                imza = (line.ornek_birim_fiyat, line.ornek_miktar)
+                if kod_vergisi:
+                    imza += (line.ornek_urun_id.id, line.servis_kaydi_id.musteri_id.id)
+                if imza not in hesaplananlar:
+                    taxes = vergiler.compute_all(
+                        line.ornek_birim_fiyat,
+                        quantity=line.ornek_miktar,
+                        currency=para_birimi,
+                        product=line.ornek_urun_id,
+                        partner=line.servis_kaydi_id.musteri_id
+                    )
+                    hesaplananlar[imza] = (taxes['total_excluded'], taxes['total_included'])
+                sonuclar[line] = hesaplananlar[imza]
+        return sonuclar
 
     @api.onchange('ornek_urun_id')
     def _onchange_ornek_urun_id(self):
@@ -1,4 +1,6 @@
 from . import kabul_formu
 from . import teslim_formu
+from . import servis_form_gonderim
+
 
 
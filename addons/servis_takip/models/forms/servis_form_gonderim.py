@@ -0,0 +1,247 @@
+from odoo import models, fields, api, _
+from datetime import timedelta
+from time import monotonic
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Bu kadar başarısız denemeden sonra iş 'Hata' durumunda bırakılır
+FORM_GONDERIM_EN_FAZLA_DENEME = 5
+
+FORM_RAPOR_ADLARI = {
+    'kabul': 'Kabul',
+    'teslim': 'Teslim',
+}
+
+
+class ServisFormGonderim(models.Model):
+    _name = 'servis.form.gonderim'
+    _description = 'Servis Formu Gönderim Kuyruğu'
+    _order = 'id desc'
+    _rec_name = 'servis_kaydi_id'
+
+    servis_kaydi_id = fields.Many2one('servis.kaydi', string='Servis Kaydı', required=True, ondelete='cascade', index=True)
+    form_tipi = fields.Selection([
+        ('kabul', 'Kabul Formu'),
+        ('teslim', 'Teslim Formu'),
+    ], string='Form', required=True)
+    email_to = fields.Char(string='Alıcı', required=True)
+    email_from = fields.Char(string='Gönderen')
+    durum = fields.Selection([
+        ('bekliyor', 'Kuyrukta'),
+        ('gonderildi', 'Gönderildi'),
+        ('hata', 'Hata'),
+    ], string='Durum', default='bekliyor', required=True, index=True)
+    deneme_sayisi = fields.Integer(string='Deneme Sayısı', readonly=True)
+    son_hata = fields.Text(string='Son Hata', readonly=True)
+    planlanan_tarih = fields.Datetime(string='Sonraki Deneme', default=fields.Datetime.now, index=True)
+    son_deneme_tarihi = fields.Datetime(string='Son Deneme', readonly=True)
+    gonderim_tarihi = fields.Datetime(string='Gönderim Tarihi', readonly=True)
+    parti_suresi_payi = fields.Float(string='Parti Süresi Payı (sn)', readonly=True, aggregator='avg',
+                                     help='Son denemede işlenen partinin toplam süresinin (PDF üretimi ve '
+                                          'SMTP gönderimi dahil) iş başına düşen payı. PDF\'ler ve e-postalar '
+                                          'toplu işlendiği için işin kendi süresi ayrıca ölçülmez.')
+    bekleme_suresi = fields.Float(string='Kuyrukta Geçen Süre (sn)', readonly=True, aggregator='avg',
+                                  help='Kuyruğa alınmasından gönderilmesine kadar geçen süre')
+    attachment_id = fields.Many2one('ir.attachment', string='Ek', readonly=True, ondelete='set null')
+    mail_id = fields.Many2one('mail.mail', string='E-Posta', readonly=True, ondelete='set null')
+
+    @api.model
+    def _kuyruga_ekle(self, servis_kaydi, form_tipleri, email_to):
+        """Her form için bir gönderim işi oluşturur ve cron'u hemen tetikler"""
+        return self._kuyruga_ekle_toplu([(servis_kaydi, form_tipleri, email_to)])
+
+    @api.model
+    def _kuyruga_ekle_toplu(self, gonderimler):
+        """gonderimler: [(servis_kaydi, form_tipleri, email_to), ...]; tek create ile kuyruğa alır
+
+        Kuyruk kullanıcılar için salt okunurdur: servis kaydına erişim kontrol
+        edildikten sonra işler sudo ile oluşturulur (create_uid yine çağıran
+        kullanıcıdır, PDF onun yetkileriyle üretilir).
+        """
+        servis_kayitlari = self.env['servis.kaydi'].union(*(g[0] for g in gonderimler))
+        servis_kayitlari.check_access('read')
+        isler = self.sudo().create([{
+            'servis_kaydi_id': servis_kaydi.id,
+            'form_tipi': form_tipi,
+            'email_to': email_to,
+            'email_from': (servis_kaydi.company_id or self.env.company).email or 'noreply@example.com',
+        } for servis_kaydi, form_tipleri, email_to in gonderimler for form_tipi in form_tipleri])
+        if isler:
+            self.env.ref('servis_takip.ir_cron_servis_form_gonderim')._trigger()
+        return self.browse(isler.ids)
+
+    @api.model
+    def _cron_form_gonderimleri(self, parti=20):
+        """Zamanı gelen işleri partiler halinde işler; her parti kendi işleminde commit edilir
+
+        Böylece gönderilmiş e-postalar sonraki bir hatayla geri alınıp tekrar
+        gönderilmez. Ertelenen denemeler için cron en yakın zamana yeniden planlanır.
+        """
+        domain = [('durum', '=', 'bekliyor'), ('planlanan_tarih', '<=', fields.Datetime.now())]
+        while True:
+            isler = self.search(domain, order='planlanan_tarih, id', limit=parti)
+            if not isler:
+                break
+            isler._isle()
+            if not self.env['ir.cron']._commit_progress(len(isler), remaining=self.search_count(domain)):
+                return
+
+        sonraki = self.search([('durum', '=', 'bekliyor')], order='planlanan_tarih', limit=1)
+        if sonraki:
+            self.env.ref('servis_takip.ir_cron_servis_form_gonderim')._trigger(at=sonraki.planlanan_tarih)
+
+    def _isle(self):
+        """İşleri birlikte işler ve sonucu her işe yazar
+
+        PDF'ler kullanıcı ve form tipine göre toplu üretilir, e-postalar tek
+        send() çağrısıyla (sunucu başına tek SMTP bağlantısı) gönderilir.
+        Her işe parti süresinin iş başına payı yazılır (parti_suresi_payi).
+        """
+        baslangic = monotonic()
+        simdi = fields.Datetime.now()
+        hatalar = {}
+
+        self._ekleri_toplu_hazirla()
+        for is_ in self:
+            try:
+                with self.env.cr.savepoint():
+                    is_._eposta_hazirla()
+            except Exception as e:
+                hatalar[is_.id] = str(e)
+
+        mailler = self.filtered(lambda i: i.id not in hatalar).mail_id
+        mailler.filtered(lambda m: m.state == 'exception').mark_outgoing()
+        try:
+            mailler.send(raise_exception=False)
+        except Exception as e:
+            hatalar.update(dict.fromkeys(self.ids, str(e)))
+
+        sure = (monotonic() - baslangic) / len(self) if self else 0.0
+        bitis = fields.Datetime.now()
+        for is_ in self:
+            hata = hatalar.get(is_.id)
+            # send() hataları yutup kaydı 'exception' durumuna alır
+            if not hata and is_.mail_id.exists() and is_.mail_id.state == 'exception':
+                hata = hatalar[is_.id] = is_.mail_id.failure_reason or _('E-posta gönderilemedi.')
+            deneme = is_.deneme_sayisi + 1
+            if hata:
+                _logger.warning("Form gönderimi başarısız (%s, deneme %s): %s",
+                                is_.servis_kaydi_id.name, deneme, hata)
+                is_.write({
+                    'deneme_sayisi': deneme,
+                    'son_hata': hata,
+                    'son_deneme_tarihi': simdi,
+                    'parti_suresi_payi': sure,
+                    'durum': 'hata' if deneme >= FORM_GONDERIM_EN_FAZLA_DENEME else 'bekliyor',
+                    # Artan bekleme: 2, 4, 8, 16 dakika
+                    'planlanan_tarih': simdi + timedelta(minutes=2 ** deneme),
+                })
+            else:
+                is_.write({
+                    'durum': 'gonderildi',
+                    'deneme_sayisi': deneme,
+                    'son_hata': False,
+                    'son_deneme_tarihi': simdi,
+                    'gonderim_tarihi': bitis,
+                    'parti_suresi_payi': sure,
+                    'bekleme_suresi': (bitis - is_.create_date).total_seconds(),
+                })
+        return not hatalar
+
+    def _ekleri_toplu_hazirla(self):
+        """Eki olmayan işlerin PDF'lerini kullanıcı + form tipi grubunda tek seferde üretir
+
+        Grup başarısız olursa (ör. tek bir kaydın erişim hatası) işler eksiz kalır
+        ve _eposta_hazirla içinde tek tek denenerek hata kayda bağlanır.
+        """
+        gruplar = {}
+        for is_ in self.filtered(lambda i: not i.attachment_id):
+            gruplar.setdefault((is_.create_uid, is_.form_tipi), self.browse())
+            gruplar[is_.create_uid, is_.form_tipi] |= is_
+        for (kullanici, form_tipi), isler in gruplar.items():
+            istek = self.with_user(kullanici).with_context(lang=kullanici.lang, tz=kullanici.tz)
+            try:
+                with self.env.cr.savepoint():
+                    pdfler = istek.env['servis.form.pdf']._pdf_al_toplu(
+                        isler.servis_kaydi_id.with_env(istek.env), form_tipi
+                    )
+                    isler._ekleri_bagla({is_: pdfler[is_.servis_kaydi_id.id] for is_ in isler})
+            except Exception as e:
+                _logger.warning("Toplu form PDF üretimi başarısız, işler tek tek denenecek: %s", e)
+
+    def _ek_adi(self):
+        self.ensure_one()
+        return f"{self.servis_kaydi_id.name}-{FORM_RAPOR_ADLARI[self.form_tipi]}-Formu.pdf"
+
+    def _ekleri_bagla(self, pdfler):
+        """İşlere ek bağlar: pdfler {iş: pdf}
+
+        Aynı servis kaydında aynı ad ve içerikte (checksum) bir ek varsa o
+        kullanılır; böylece tekrar gönderilen formlar yeni kopya oluşturmaz.
+        Yeni ekler ham içerikle (raw) tek create'te yazılır.
+        """
+        Attachment = self.env['ir.attachment'].sudo()
+        anahtarlar = {
+            is_: (is_.servis_kaydi_id.id, is_._ek_adi(), Attachment._compute_checksum(pdf))
+            for is_, pdf in pdfler.items()
+        }
+        mevcut = {}
+        for ek in Attachment.search([
+            ('res_model', '=', 'servis.kaydi'),
+            ('res_id', 'in', list({a[0] for a in anahtarlar.values()})),
+            ('checksum', 'in', list({a[2] for a in anahtarlar.values()})),
+        ], order='id'):
+            mevcut.setdefault((ek.res_id, ek.name, ek.checksum), ek)
+
+        yeni = {}
+        for is_, anahtar in anahtarlar.items():
+            if anahtar not in mevcut:
+                yeni.setdefault(anahtar, pdfler[is_])
+        if yeni:
+            ekler = Attachment.create([{
+                'name': ad,
+                'raw': pdf,
+                'res_model': 'servis.kaydi',
+                'res_id': servis_kaydi_id,
+                'type': 'binary',
+                'mimetype': 'application/pdf',
+            } for (servis_kaydi_id, ad, _checksum), pdf in yeni.items()])
+            mevcut.update(zip(yeni, ekler))
+
+        for is_, anahtar in anahtarlar.items():
+            is_.attachment_id = mevcut[anahtar]
+
+    def _eposta_hazirla(self):
+        """Ek ve e-posta kaydını ilk denemede oluşturur; sonraki denemeler aynılarını kullanır
+
+        PDF, işi kuyruğa alan kullanıcının yetkileri ve dil/saat dilimi ile üretilir.
+        """
+        self.ensure_one()
+        servis_kaydi = self.servis_kaydi_id
+        if not self.attachment_id:
+            kullanici = self.create_uid
+            istek = self.with_user(kullanici).with_context(lang=kullanici.lang, tz=kullanici.tz)
+            pdf = istek.env['servis.form.pdf']._pdf_al(servis_kaydi.with_env(istek.env), self.form_tipi)
+            self._ekleri_bagla({self: pdf})
+        if not self.mail_id:
+            self.mail_id = self.env['mail.mail'].sudo().create({
+                'subject': f"{servis_kaydi.name} - {FORM_RAPOR_ADLARI[self.form_tipi]} Formu",
+                'body_html': f"""
+                    <p>Merhaba {servis_kaydi.musteri_id.name},</p>
+                    <p>Teknik servis kaydı <strong>{servis_kaydi.name}</strong> için hazırlanan formu ekte sunulmuştur.</p>
+                    <p>Saygılarımızla,<br/>Teknik Servis Takip Sistemi</p>
+                """,
+                'email_from': self.email_from,
+                'email_to': self.email_to,
+                'attachment_ids': [(6, 0, self.attachment_id.ids)],
+            })
+
+    def action_yeniden_dene(self):
+        """Seçili işleri hemen tekrar kuyruğa alır (kuyruk salt okunur, yazma sudo ile)"""
+        self.servis_kaydi_id.check_access('read')
+        self.sudo().filtered(lambda i: i.durum != 'gonderildi').write({
+            'durum': 'bekliyor',
+            'planlanan_tarih': fields.Datetime.now(),
+        })
+        self.env.ref('servis_takip.ir_cron_servis_form_gonderim')._trigger()
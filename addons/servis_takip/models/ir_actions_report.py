@@ -0,0 +1,22 @@
+from odoo import models
+
+from .reports.servis_form_pdf import RAPOR_FORM_TIPI
+
+# /report/pdf rotası URL parametrelerini data olarak iletir; bunlar çıktıyı etkilemez
+ONBELLEK_DISI_DATA = {'context', 'download', 'report_type'}
+
+
+class IrActionsReport(models.Model):
+    _inherit = 'ir.actions.report'
+
+    def _render_qweb_pdf(self, report_ref, res_ids=None, data=None):
+        """Kabul/teslim formları tek kayıt için servis.form.pdf önbelleğinden sunulur"""
+        if res_ids and not self.env.context.get('servis_form_onbellek_atla') \
+                and set(data or {}) <= ONBELLEK_DISI_DATA:
+            form_tipi = RAPOR_FORM_TIPI.get(self._get_report(report_ref).report_name)
+            if isinstance(res_ids, int):
+                res_ids = [res_ids]
+            if form_tipi and len(res_ids) == 1:
+                servis_kaydi = self.env['servis.kaydi'].browse(res_ids)
+                return self.env['servis.form.pdf']._pdf_al(servis_kaydi, form_tipi), 'pdf'
+        return super()._render_qweb_pdf(report_ref, res_ids=res_ids, data=data)
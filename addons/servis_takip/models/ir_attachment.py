@@ -0,0 +1,112 @@
+from odoo import models, fields, api
+from datetime import timedelta
+
+from .barkod_etiketi_mixin import BARKOD_EK_MODELI, BARKOD_EK_SAKLAMA_GUNU
+
+
+class IrAttachment(models.Model):
+    _inherit = 'ir.attachment'
+
+    @api.model
+    def _cron_servis_ekleri_tekillestir(self, parti=500):
+        """servis.kaydi üzerindeki kopya ekleri birleştirir
+
+        Aynı kayıt, ad ve içerikteki (checksum) eklerden en eskisi tutulur;
+        kopyalara verilen tüm referanslar (e-postalar, mesajlar, gönderim işleri
+        vb.) ona taşınır ve kopyalar silinir. Dosya deposu içeriği checksum ile
+        paylaştığından yer, silinen kayıtlarla birlikte geri kazanılır.
+        """
+        while True:
+            self.env.flush_all()
+            self.env.cr.execute("""
+                SELECT ids[1], ids[2:]
+                  FROM (
+                        SELECT array_agg(id ORDER BY id) AS ids
+                          FROM ir_attachment
+                         WHERE res_model = 'servis.kaydi'
+                           AND res_field IS NULL
+                           AND type = 'binary'
+                           AND checksum IS NOT NULL
+                         GROUP BY res_id, name, checksum
+                        HAVING COUNT(*) > 1
+                         LIMIT %s
+                       ) kopya
+            """, (parti,))
+            gruplar = self.env.cr.fetchall()
+            if not gruplar:
+                return
+            self._ekleri_birlestir(dict(
+                (kopya_id, asil_id) for asil_id, kopya_ids in gruplar for kopya_id in kopya_ids
+            ))
+            if not self.env['ir.cron']._commit_progress(len(gruplar)):
+                return
+
+    @api.model
+    def _cron_barkod_onbellegi_temizle(self, parti=1000):
+        """BARKOD_EK_SAKLAMA_GUNU boyunca kullanılmayan barkod eklerini siler
+
+        Kullanım write_date üzerinden izlenir (_barkod_eklerini_tazele); silinen
+        barkod gerekirse bir sonraki baskıda yeniden üretilir.
+        """
+        domain = [
+            ('res_model', '=', BARKOD_EK_MODELI),
+            ('write_date', '<', fields.Datetime.now() - timedelta(days=BARKOD_EK_SAKLAMA_GUNU)),
+        ]
+        while True:
+            ekler = self.search(domain, limit=parti)
+            if not ekler:
+                return
+            ekler.unlink()
+            if not self.env['ir.cron']._commit_progress(len(ekler), remaining=self.search_count(domain)):
+                return
+
+    @api.model
+    def _ekleri_birlestir(self, eslesme):
+        """eslesme: {kopya_id: asil_id}; ir.attachment'a işaret eden saklı alanları asıla taşır, kopyaları siler"""
+        if not eslesme:
+            return
+        cr = self.env.cr
+        cr.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS servis_ek_eslesme (kopya_id int PRIMARY KEY, asil_id int)
+            ON COMMIT DROP
+        """)
+        cr.execute("TRUNCATE servis_ek_eslesme")
+        cr.execute(
+            "INSERT INTO servis_ek_eslesme SELECT * FROM unnest(%s::int[], %s::int[])",
+            (list(eslesme), list(eslesme.values()))
+        )
+
+        islenen = set()
+        for model in self.env.registry.values():
+            if model._abstract or not model._auto:
+                continue
+            for field in model._fields.values():
+                if field.comodel_name != 'ir.attachment' or not field.store or field.inherited:
+                    continue
+                if field.type == 'many2one':
+                    anahtar = (model._table, field.name)
+                    if anahtar in islenen:
+                        continue
+                    islenen.add(anahtar)
+                    cr.execute(f"""
+                        UPDATE "{model._table}" t SET "{field.name}" = e.asil_id
+                          FROM servis_ek_eslesme e WHERE t."{field.name}" = e.kopya_id
+                    """)
+                elif field.type == 'many2many':
+                    anahtar = (field.relation, field.column1, field.column2)
+                    if anahtar in islenen:
+                        continue
+                    islenen.add(anahtar)
+                    cr.execute(f"""
+                        INSERT INTO "{field.relation}" ("{field.column1}", "{field.column2}")
+                        SELECT r."{field.column1}", e.asil_id
+                          FROM "{field.relation}" r JOIN servis_ek_eslesme e ON r."{field.column2}" = e.kopya_id
+                        ON CONFLICT DO NOTHING
+                    """)
+                    cr.execute(f"""
+                        DELETE FROM "{field.relation}" r USING servis_ek_eslesme e
+                         WHERE r."{field.column2}" = e.kopya_id
+                    """)
+
+        self.env.invalidate_all()
+        self.browse(list(eslesme)).sudo().unlink()
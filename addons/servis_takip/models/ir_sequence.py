@@ -0,0 +1,76 @@
+from odoo import models, fields, api
+
+
+class IrSequence(models.Model):
+    _inherit = 'ir.sequence'
+
+    @api.model
+    def _next_by_code_blok(self, sequence_code, adet):
+        """next_by_code'un toplu hali: `adet` kadar numarayı tek seferde ayırır
+
+        Standart (PostgreSQL sequence) ve no_gap sequence'lerde numaralar tek
+        sorguda alınır; tarih aralıklı sequence'lerde bugünün aralığı kullanılır
+        (yoksa next_by_code gibi oluşturulur). Sequence bulunamazsa next_by_code
+        gibi None değerleri döner.
+        """
+        if adet <= 0:
+            return []
+
+        self.check_access('read')
+        company_id = self.env.company.id
+        seq = self.sudo().search([
+            ('code', '=', sequence_code),
+            ('company_id', 'in', [company_id, False])
+        ], order='company_id', limit=1)
+
+        if not seq:
+            return [None] * adet
+
+        if seq.implementation not in ('standard', 'no_gap'):
+            return [seq._next() for _ in range(adet)]
+
+        if not seq.use_date_range:
+            numaralar = seq._blok_ayir(
+                'ir_sequence', seq.id, 'ir_sequence_%03d' % seq.id, adet
+            )
+            return [seq.get_next_char(numara) for numara in numaralar]
+
+        tarih = self.env.context.get('ir_sequence_date') or fields.Date.today()
+        seq_date = self.env['ir.sequence.date_range'].sudo().search([
+            ('sequence_id', '=', seq.id),
+            ('date_from', '<=', tarih),
+            ('date_to', '>=', tarih),
+        ], limit=1)
+        if not seq_date:
+            seq_date = seq._create_date_range_seq(tarih)
+        numaralar = seq._blok_ayir(
+            'ir_sequence_date_range', seq_date.id, 'ir_sequence_%03d_%03d' % (seq.id, seq_date.id), adet
+        )
+        seq = seq.with_context(ir_sequence_date_range=seq_date.date_from)
+        seq_date.invalidate_recordset(['number_next'])
+        return [seq.get_next_char(numara) for numara in numaralar]
+
+    def _blok_ayir(self, tablo, satir_id, pg_sequence, adet):
+        """Sayaçtan `adet` numara ayırır; tablo: ir_sequence veya ir_sequence_date_range"""
+        self.ensure_one()
+        if self.implementation == 'standard':
+            # PostgreSQL sequence zaten number_increment ile artıyor
+            self.env.cr.execute(
+                "SELECT nextval(%s) FROM generate_series(1, %s)",
+                (pg_sequence, adet)
+            )
+            return [row[0] for row in self.env.cr.fetchall()]
+
+        # no_gap: satırı kilitle ve sayacı tek UPDATE ile ilerlet
+        artis = self.number_increment
+        self.env.cr.execute(
+            f"SELECT number_next FROM {tablo} WHERE id = %s FOR UPDATE NOWAIT",
+            (satir_id,)
+        )
+        baslangic = self.env.cr.fetchone()[0]
+        self.env.cr.execute(
+            f"UPDATE {tablo} SET number_next = number_next + %s WHERE id = %s",
+            (artis * adet, satir_id)
+        )
+        self.invalidate_recordset(['number_next'])
+        return [baslangic + artis * i for i in range(adet)]
@@ -40,15 +40,7 @@ class OzelNotebookSatiri(models.Model):
 
     def _get_kolon_listesi(self):
         """Dinamik alan değer listesi - özelleştirmeden isimleri al"""
-        ozellestirme = self.env['servis.ozellestirme'].get_ozellestirme()
-        return [
-            ('alan1', ozellestirme.ozel_alan_1_adi or 'Özel Alan 1'),
-            ('alan2', ozellestirme.ozel_alan_2_adi or 'Özel Alan 2'),
-            ('alan3', ozellestirme.ozel_alan_3_adi or 'Özel Alan 3'),
-            ('alan4', ozellestirme.ozel_alan_4_adi or 'Özel Alan 4'),
-            ('alan5', ozellestirme.ozel_alan_5_adi or 'Özel Alan 5'),
-            ('alan6', ozellestirme.ozel_alan_6_adi or 'Özel Alan 6'),
-        ]
+        return list(self.env['servis.ozellestirme']._get_kolon_etiketleri())
 
     @api.model
     def fields_get(self, allfields=None, attributes=None):
@@ -1,4 +1,7 @@
-from odoo import models, fields, api
+from odoo import models, fields, api, tools
+
+# servis.kaydi üzerinde saklanan değerleri etkileyen alanlar; geri kalanlar sadece etiket
+SAKLI_DEGER_ALANLARI = {'ozel_notebook_1_adi'}
 
 
 class ServisOzellestirme(models.Model):
@@ -31,34 +34,106 @@ class ServisOzellestirme(models.Model):
     ozel_alan_5_liste_adi = fields.Char(string='Özel Alan 5 Listede Adı', default='Özel Alan 5')
     ozel_alan_6_liste_adi = fields.Char(string='Özel Alan 6 Listede Adı', default='Özel Alan 6')
 
+    etiket_yenileme_kalan = fields.Integer(
+        string='Güncellenmeyi Bekleyen Kayıt',
+        compute='_compute_etiket_yenileme_kalan'
+    )
+
+    def _compute_etiket_yenileme_kalan(self):
+        for record in self:
+            record.etiket_yenileme_kalan = self.env['servis.kaydi'].search_count(
+                record._eski_etiketli_domain()
+            )
+
+    def _eski_etiketli_domain(self):
+        """Saklanan notebook etiketi güncel ayardan farklı olan servis kayıtları"""
+        yeni = self.get_ozellestirme().ozel_notebook_1_adi or False
+        if not yeni:
+            return [('ozel_notebook_1_label', '!=', False)]
+        return ['|', ('ozel_notebook_1_label', '=', False), ('ozel_notebook_1_label', '!=', yeni)]
+
+    @api.model
+    @tools.ormcache()
+    def _get_ozellestirme_id(self):
+        """Singleton kaydın id'si (yoksa False); önbellek write/create/unlink'te temizlenir"""
+        return self.sudo().search([], limit=1).id
+
     @api.model
     def get_ozellestirme(self):
-        """Özelleştirme datasını getir, yoksa yarat"""
-        res = self.search([], limit=1)
-        if not res:
-            res = self.create({})
-        return res
+        """Özelleştirme datasını getir (kurulumda data XML ile oluşturulur)
+
+        Önbellekli yol kayıt oluşturmaz; kayıt silinmişse boş recordset döner ve
+        çağıranlar varsayılan etiketlere düşer. Geri alınan bir işlemde
+        oluşturulmuş id'nin önbellekte kalması böylece mümkün olmaz.
+        """
+        return self.browse(self._get_ozellestirme_id())
+
+    @api.model
+    def action_ozellestirme_ac(self):
+        """Menü aksiyonu: singleton formunu açar, silinmişse yeniden oluşturur"""
+        ozellestirme = self.get_ozellestirme() or self.create({})
+        return ozellestirme.get_formview_action()
+
+    @api.model
+    @tools.ormcache()
+    def _get_liste_etiketleri(self):
+        """servis.kaydi listesindeki 6 özel alan sütun başlığı: {'ozel_alan_1_degeri': etiket, ...}"""
+        ozellestirme = self.sudo().get_ozellestirme()
+        return {
+            f'ozel_alan_{i}_degeri': ozellestirme[f'ozel_alan_{i}_liste_adi'] or f'Özel Alan {i}'
+            for i in range(1, 7)
+        }
+
+    @api.model
+    @tools.ormcache()
+    def _get_kolon_etiketleri(self):
+        """Notebook satırı kolon seçimi için 6 dropdown adı: (('alan1', etiket), ...)"""
+        ozellestirme = self.sudo().get_ozellestirme()
+        return tuple(
+            (f'alan{i}', ozellestirme[f'ozel_alan_{i}_adi'] or f'Özel Alan {i}')
+            for i in range(1, 7)
+        )
 
     def write(self, vals):
-        """Değişiklik yapıldığında servis.kaydi records'larını invalidate et"""
+        """Etiket değişikliklerinde sadece önbelleği temizle, saklanan değerleri
+        etkileyen değişikliklerde yeniden hesaplamayı arka plana bırak"""
         result = super().write(vals)
-        
+
         if vals:
-            # Tüm servis.kaydi records'larının computed field'larını recalculate et
-            servis_kaydi_records = self.env['servis.kaydi'].search([])
-            
-            # Computed field'ları manual trigger et
-            servis_kaydi_records._compute_ozel_notebook_labels()
-            servis_kaydi_records._compute_ozel_alan_degerleri()
-        
+            # Dropdown/liste adları fields_get üzerinden okunur, kayıtlara yazılmaz
+            self.env.registry.clear_cache()
+        if SAKLI_DEGER_ALANLARI.intersection(vals):
+            self.env.ref('servis_takip.ir_cron_ozel_notebook_etiket_yenile')._trigger()
+
         return result
 
+    @api.model
+    def _cron_ozel_notebook_etiket_yenile(self, parca_boyutu=1000):
+        """Eski etiketli servis kayıtlarını parça parça yeniden hesapla
+
+        Sadece değeri değişmesi gereken kayıtlar seçildiği için iş yarıda
+        kesilirse sonraki çalışmada kaldığı yerden devam eder.
+        """
+        ServisKaydi = self.env['servis.kaydi']
+        field = ServisKaydi._fields['ozel_notebook_1_label']
+        domain = self._eski_etiketli_domain()
+        kalan = ServisKaydi.search_count(domain)
+
+        while kalan > 0:
+            kayitlar = ServisKaydi.search(domain, limit=parca_boyutu)
+            if not kayitlar:
+                break
+            self.env.add_to_compute(field, kayitlar)
+            kayitlar.flush_recordset(['ozel_notebook_1_label'])
+            self.env.invalidate_all()
+            kalan -= len(kayitlar)
+            # İlerlemeyi cron kaydına işler ve commit eder; süre dolduysa sonraki çalışmaya bırak
+            if not self.env['ir.cron']._commit_progress(len(kayitlar), remaining=max(kalan, 0)):
+                break
+
     def kaydet_ve_yenile(self):
         """Kaydet butonu - değişiklikleri kaydet ve sayfayı yenile"""
-        # Tüm servis.kaydi records'larını trigger et
-        servis_kaydi_records = self.env['servis.kaydi'].search([])
-        servis_kaydi_records._compute_ozel_alan_degerleri()
-        
+        # Yeniden hesaplama write içinde arka plana alındı, burada sadece sayfa yenilenir
         return {
             'type': 'ir.actions.client',
             'tag': 'reload',
@@ -81,4 +156,11 @@ class ServisOzellestirme(models.Model):
                 vals_list = [vals_list[0]]
             existing.write(vals_list[0] if vals_list else {})
             return existing
-        return super().create(vals_list)
+        records = super().create(vals_list)
+        self.env.registry.clear_cache()
+        return records
+
+    def unlink(self):
+        res = super().unlink()
+        self.env.registry.clear_cache()
+        return res
@@ -1,4 +1,8 @@
 from . import kabul_formu
 from . import teslim_formu
+from . import servis_kaydi_analiz
+from . import servis_kpi_gunluk
+from . import barkod_etiket_sayfasi
+from . import servis_form_pdf
 
 
@@ -0,0 +1,66 @@
+from odoo import models, api
+
+# A4 ızgara yerleşimleri (ölçüler mm); rulo baskı 10x8 cm'lik mevcut raporu kullanır
+ETIKET_YERLESIMLERI = {
+    'a4_2x3': {'sutun': 2, 'satir': 3, 'genislik': 100, 'yukseklik': 80, 'kompakt': False},
+    'a4_3x8': {'sutun': 3, 'satir': 8, 'genislik': 70, 'yukseklik': 37, 'kompakt': True},
+}
+
+
+def _etiket_verilerini_hazirla(docs):
+    """Etiket alanlarını önceden yükler ve barkodları toplu üretir"""
+    docs._etiket_alanlarini_yukle()
+    return docs.get_barcode_base64_toplu('svg')
+
+
+class ReportBarkodEtiketi(models.AbstractModel):
+    _name = 'report.servis_takip.report_barkod_etiketi'
+    _description = 'Barkod Etiketi Raporu (Rulo)'
+
+    @api.model
+    def _get_report_values(self, docids, data=None):
+        docs = self.env['servis.kaydi'].browse(docids)
+        return {
+            'doc_ids': docids,
+            'doc_model': 'servis.kaydi',
+            'docs': docs,
+            'barkodlar': _etiket_verilerini_hazirla(docs),
+        }
+
+
+class ReportBarkodEtiketSayfasi(models.AbstractModel):
+    _name = 'report.servis_takip.report_barkod_etiket_sayfasi'
+    _description = 'Barkod Etiketi Raporu (A4 Sayfa)'
+
+    @api.model
+    def _get_report_values(self, docids, data=None):
+        """Kayıtları sayfa > satır > sütun ızgarasına dağıtır
+
+        data: {'servis_kaydi_ids': [...], 'yerlesim': ETIKET_YERLESIMLERI anahtarı,
+               'baslangic_konumu': ilk dolu hücre (1'den)}
+        Başlangıç konumu yarım kullanılmış etiket sayfalarını tekrar kullanmak içindir.
+        """
+        data = data or {}
+        yerlesim = ETIKET_YERLESIMLERI.get(data.get('yerlesim')) or ETIKET_YERLESIMLERI['a4_2x3']
+        docids = docids or data.get('servis_kaydi_ids') or []
+        docs = self.env['servis.kaydi'].browse(docids)
+        barkodlar = _etiket_verilerini_hazirla(docs)
+
+        sutun = yerlesim['sutun']
+        sayfa_basina = sutun * yerlesim['satir']
+        bos = min(max(int(data.get('baslangic_konumu') or 1), 1), sayfa_basina) - 1
+        hucreler = [False] * bos + list(docs)
+        sayfalar = []
+        for i in range(0, len(hucreler), sayfa_basina):
+            sayfa = hucreler[i:i + sayfa_basina]
+            sayfa += [False] * (-len(sayfa) % sutun)
+            sayfalar.append([sayfa[j:j + sutun] for j in range(0, len(sayfa), sutun)])
+
+        return {
+            'doc_ids': docids,
+            'doc_model': 'servis.kaydi',
+            'docs': docs,
+            'barkodlar': barkodlar,
+            'yerlesim': yerlesim,
+            'sayfalar': sayfalar,
+        }
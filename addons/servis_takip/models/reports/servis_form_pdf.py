@@ -0,0 +1,180 @@
+from odoo import models, fields, api
+from odoo.tools import mute_logger, split_every
+from psycopg2 import IntegrityError
+import base64
+import hashlib
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Şablonların okuduğu veriler; noktalı yollar record.mapped() ile okunur
+FORM_PDF_RAPORLARI = {
+    'kabul': {
+        'rapor': 'servis_takip.report_kabul_formu_template',
+        'alanlar': [
+            'name', 'kayit_tarihi', 'seri_no', 'teknisyen_notu', 'teslim_eden', 'kabul_musteri_imzasi',
+            'urun_turu_id.name', 'urun_marka_id.name', 'urun_modeli_id.name',
+        ],
+        'satirlar': {
+            'ariza_detay_ids': ['ariza_tanimi_id.display_name', 'musteri_notu'],
+            'aksesuar_ids': ['aksesuar_id.name', 'miktar'],
+        },
+    },
+    'teslim': {
+        'rapor': 'servis_takip.report_teslim_formu_template',
+        'alanlar': [
+            'name', 'state', 'kayit_tarihi', 'teslim_tarihi', 'seri_no', 'teknisyen_notu', 'teslim_alan',
+            'teslim_musteri_imzasi', 'rapor_parca_hizmet_ekle', 'vergi_haric_tutar', 'toplam_vergi',
+            'genel_toplam', 'company_currency_id.id',
+            'urun_turu_id.name', 'urun_marka_id.name', 'urun_modeli_id.name',
+        ],
+        'satirlar': {
+            'ariza_detay_ids': ['ariza_tanimi_id.display_name', 'musteri_notu'],
+            'deger_okuma_ids': ['deger_okuma_tanimi_id.name', 'aciklama'],
+            'servis_islem_satirlari': ['islem_tipi_id.name', 'aciklama'],
+            'teknik_rapor_satirlari': ['ornek_urun_id.name', 'ornek_miktar', 'ornek_birim_fiyat', 'ornek_ara_toplam'],
+        },
+    },
+}
+MUSTERI_ALANLARI = ['name', 'street', 'city', 'phone', 'email']
+# web.external_layout başlık/altlığında kullanılan şirket alanları
+SIRKET_ALANLARI = [
+    'name', 'logo', 'street', 'street2', 'zip', 'city', 'state_id', 'country_id', 'phone', 'email',
+    'website', 'vat', 'company_registry', 'report_header', 'report_footer', 'company_details',
+    'external_report_layout_id', 'layout_background', 'layout_background_image', 'font',
+    'primary_color', 'secondary_color', 'paperformat_id',
+]
+RAPOR_FORM_TIPI = {tanim['rapor']: tip for tip, tanim in FORM_PDF_RAPORLARI.items()}
+
+
+class ServisFormPdf(models.Model):
+    _name = 'servis.form.pdf'
+    _description = 'Servis Formu PDF Önbelleği'
+
+    servis_kaydi_id = fields.Many2one('servis.kaydi', string='Servis Kaydı', required=True, ondelete='cascade', index=True)
+    form_tipi = fields.Selection([
+        ('kabul', 'Kabul Formu'),
+        ('teslim', 'Teslim Formu'),
+    ], string='Form Tipi', required=True)
+    ozet = fields.Char(string='Veri Özeti', required=True)
+    pdf = fields.Binary(string='PDF', attachment=True)
+
+    _servis_form_uniq = models.UniqueIndex(
+        '(servis_kaydi_id, form_tipi)',
+        "Bu servis kaydının bu form için zaten bir PDF önbelleği var."
+    )
+
+    @api.model
+    def _pdf_al(self, servis_kaydi, form_tipi):
+        """Formun PDF'i: veri özeti değişmediyse önbellekten, değiştiyse yeniden üretilir"""
+        servis_kaydi.ensure_one()
+        return self._pdf_al_toplu(servis_kaydi, form_tipi)[servis_kaydi.id]
+
+    @api.model
+    def _pdf_al_toplu(self, servis_kayitlari, form_tipi, parca_boyutu=50):
+        """Kayıtların form PDF'leri: {servis_kaydi_id: pdf}
+
+        Önbellekte güncel olanlar oradan alınır. Eksikler parça başına tek
+        wkhtmltopdf çağrısıyla üretilip kayıt bazında (kayıt başına tek üst
+        seviye başlık / ana hat) bölünür. Çıktı bölünemezse (False anahtarı)
+        birleşik akış kapatılır ve kalan parçalar doğrudan kayıt kayıt üretilir;
+        aynı şablon sonraki parçalarda da bölünemeyeceği için tekrar denenmez.
+        """
+        ozetler = {kayit.id: self._veri_ozeti(kayit, form_tipi) for kayit in servis_kayitlari}
+        onbellekler = {o.servis_kaydi_id.id: o for o in self.sudo().search([
+            ('servis_kaydi_id', 'in', servis_kayitlari.ids),
+            ('form_tipi', '=', form_tipi),
+        ])}
+        sonuc = {}
+        eksik = []
+        for kayit_id, ozet in ozetler.items():
+            onbellek = onbellekler.get(kayit_id)
+            if onbellek and onbellek.pdf and onbellek.ozet == ozet:
+                sonuc[kayit_id] = base64.b64decode(onbellek.pdf)
+            else:
+                eksik.append(kayit_id)
+
+        rapor = FORM_PDF_RAPORLARI[form_tipi]['rapor']
+        Report = self.env['ir.actions.report'].with_context(servis_form_onbellek_atla=True)
+        bolunebilir = True
+        for parca in split_every(parca_boyutu, eksik, list):
+            uretilen = {}
+            if bolunebilir and len(parca) > 1:
+                akislar = Report._render_qweb_pdf_prepare_streams(rapor, {}, res_ids=parca)
+                if False in akislar:
+                    _logger.warning("%s çıktısı kayıtlara bölünemedi, PDF'ler tek tek üretilecek.", rapor)
+                    bolunebilir = False
+                for kayit_id, akis in akislar.items():
+                    if not akis['stream']:
+                        continue
+                    if kayit_id and bolunebilir:
+                        uretilen[kayit_id] = akis['stream'].getvalue()
+                    akis['stream'].close()
+            for kayit_id in parca:
+                if kayit_id not in uretilen:
+                    uretilen[kayit_id] = Report._render_qweb_pdf(rapor, res_ids=[kayit_id])[0]
+                self._onbellege_yaz(kayit_id, form_tipi, ozetler[kayit_id], uretilen[kayit_id], onbellekler.get(kayit_id))
+            sonuc.update(uretilen)
+        return sonuc
+
+    @api.model
+    def _onbellege_yaz(self, servis_kaydi_id, form_tipi, ozet, pdf, onbellek=None):
+        vals = {'ozet': ozet, 'pdf': base64.b64encode(pdf)}
+        if onbellek:
+            onbellek.write(vals)
+            return
+        try:
+            with self.env.cr.savepoint(), mute_logger('odoo.sql_db'):
+                self.sudo().create(dict(vals, servis_kaydi_id=servis_kaydi_id, form_tipi=form_tipi))
+        except IntegrityError:
+            # Aynı form eşzamanlı başka bir istekte yazıldı
+            pass
+
+    @api.model
+    def _veri_ozeti(self, servis_kaydi, form_tipi):
+        """Şablonun okuduğu kayıt alanları, satırlar, imzalar ve şirket başlığının özeti
+
+        Şablonlar belge tarihi olarak kullanıcının saat dilimindeki bugünü
+        (context_timestamp) bastığı için aynı gün özete dahildir;
+        modül güncellemesinde şablon görünümlerinin write_date'i değiştiğinden
+        eski PDF'ler kendiliğinden geçersiz olur.
+        """
+        tanim = FORM_PDF_RAPORLARI[form_tipi]
+        kayit = servis_kaydi.with_context(bin_size=False)
+        sirket = kayit.company_id or self.env.company
+        degerler = [
+            form_tipi,
+            self.env.lang,
+            self.env.context.get('tz') or self.env.user.tz,
+            fields.Date.context_today(self),
+            self._sablon_surumu(tanim['rapor'], sirket),
+        ]
+        degerler += [kayit.mapped(alan) for alan in tanim['alanlar']]
+        degerler += [kayit.musteri_id[alan] for alan in MUSTERI_ALANLARI]
+        for satir_alani, alt_alanlar in tanim['satirlar'].items():
+            for satir in kayit[satir_alani]:
+                degerler += [satir.mapped(alan) for alan in alt_alanlar]
+        sirket = sirket.sudo().with_context(bin_size=False)
+        degerler += [sirket[alan] for alan in SIRKET_ALANLARI if alan in sirket._fields]
+
+        ozet = hashlib.sha256()
+        for deger in degerler:
+            if isinstance(deger, models.BaseModel):
+                deger = deger.ids
+            ozet.update(repr(deger).encode())
+            ozet.update(b'\0')
+        return ozet.hexdigest()
+
+    @api.model
+    def _sablon_surumu(self, rapor, sirket):
+        """Rapor şablonu, şirketin dış yerleşimi ve bunları kalıtan görünümlerin son değişikliği"""
+        anahtarlar = [rapor, 'web.external_layout']
+        if sirket.external_report_layout_id:
+            anahtarlar.append(sirket.external_report_layout_id.key)
+        self.env['ir.ui.view'].flush_model(['key', 'inherit_id', 'write_date'])
+        self.env.cr.execute("""
+            SELECT MAX(write_date) FROM ir_ui_view
+             WHERE key IN %(k)s
+                OR inherit_id IN (SELECT id FROM ir_ui_view WHERE key IN %(k)s)
+        """, {'k': tuple(anahtarlar)})
+        return self.env.cr.fetchone()[0]
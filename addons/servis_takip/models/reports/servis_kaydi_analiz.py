@@ -0,0 +1,114 @@
+from odoo import models, fields, api, tools
+
+
+class ServisKaydiAnaliz(models.Model):
+    _name = 'servis.kaydi.analiz'
+    _description = 'Servis Kaydı Analizi'
+    _auto = False
+    _rec_name = 'servis_kaydi_id'
+    _order = 'kayit_tarihi desc'
+
+    # --- Boyutlar ---
+    servis_kaydi_id = fields.Many2one('servis.kaydi', string='Servis Kaydı', readonly=True)
+    company_id = fields.Many2one('res.company', string='Şirket', readonly=True)
+    musteri_id = fields.Many2one('res.partner', string='Müşteri', readonly=True)
+    state = fields.Selection(selection='_get_durum_listesi', string='Durum', readonly=True)
+    kayit_tarihi = fields.Datetime(string='Ürün Giriş Tarihi', readonly=True)
+    teslim_tarihi = fields.Datetime(string='Teslim Tarihi', readonly=True)
+    urun_turu_id = fields.Many2one('urun.turu', string='Ürün Türü', readonly=True)
+    urun_marka_id = fields.Many2one('urun.markasi', string='Ürün Markası', readonly=True)
+    urun_modeli_id = fields.Many2one('urun.modeli', string='Ürün Modeli', readonly=True)
+    ariza_tanimi_id = fields.Many2one('servis.ariza.tanimi', string='Arıza Tipi', readonly=True,
+                                      help='Kayda girilen ilk arıza tipi')
+    teknisyen_id = fields.Many2one('res.users', string='Teknisyen', readonly=True,
+                                   help='Son işlem satırını giren personel')
+
+    # --- Ölçüler ---
+    kayit_sayisi = fields.Integer(string='Kayıt Sayısı', readonly=True)
+    vergi_haric_tutar = fields.Float(string='Vergi Hariç Tutar', readonly=True)
+    toplam_vergi = fields.Float(string='Vergi', readonly=True)
+    genel_toplam = fields.Float(string='Ciro', readonly=True)
+    servis_suresi_gun = fields.Float(string='Servis Süresi (Gün)', readonly=True, aggregator='avg')
+    onay_bekleme_gun = fields.Float(string='Onay Bekleme (Gün)', readonly=True, aggregator='avg')
+    islemde_gun = fields.Float(string='İşlemde Geçen (Gün)', readonly=True, aggregator='avg')
+    parca_adedi = fields.Float(string='Yedek Parça Adedi', readonly=True)
+    hizmet_adedi = fields.Float(string='Hizmet Adedi', readonly=True)
+    ariza_sayisi = fields.Integer(string='Arıza Sayısı', readonly=True)
+    durum_degisim_sayisi = fields.Integer(string='Durum Değişim Sayısı', readonly=True)
+    sure_asimi_sayisi = fields.Integer(string='Süre Aşımı', readonly=True)
+
+    @api.model
+    def _get_durum_listesi(self):
+        # Pasif durumlardaki eski kayıtlar da etiketli görünsün
+        return list(self.env['servis.durum.tanimi']._get_durum_etiket_map().items())
+
+    def init(self):
+        """Satır başına bir servis kaydı; alt tablolar servis_kaydi_id üzerinden
+        önceden gruplanarak birleştirilir, böylece tutarlar çoğalmaz"""
+        tools.drop_view_if_exists(self.env.cr, self._table)
+        self.env.cr.execute(f"""
+            CREATE OR REPLACE VIEW {self._table} AS (
+                SELECT
+                    sk.id AS id,
+                    sk.id AS servis_kaydi_id,
+                    sk.company_id,
+                    sk.musteri_id,
+                    sk.state,
+                    sk.kayit_tarihi,
+                    sk.teslim_tarihi,
+                    COALESCE(sk.urun_turu_id, um.tur_id) AS urun_turu_id,
+                    COALESCE(sk.urun_marka_id, um.marka_id) AS urun_marka_id,
+                    sk.urun_modeli_id,
+                    ariza.ariza_tanimi_id,
+                    islem.teknisyen_id,
+                    1 AS kayit_sayisi,
+                    COALESCE(sk.vergi_haric_tutar, 0) AS vergi_haric_tutar,
+                    COALESCE(sk.toplam_vergi, 0) AS toplam_vergi,
+                    COALESCE(sk.genel_toplam, 0) AS genel_toplam,
+                    -- Açık kayıtlar NULL kalır ki ortalamaya girmesin
+                    CASE WHEN sk.state IN ('teslim_edildi', 'iptal') AND sk.teslim_tarihi IS NOT NULL
+                         THEN sk.servis_suresi / 86400.0 END AS servis_suresi_gun,
+                    COALESCE(durum.onay_bekleme_sn, 0) / 86400.0 AS onay_bekleme_gun,
+                    COALESCE(durum.islemde_sn, 0) / 86400.0 AS islemde_gun,
+                    COALESCE(satir.parca_adedi, 0) AS parca_adedi,
+                    COALESCE(satir.hizmet_adedi, 0) AS hizmet_adedi,
+                    COALESCE(ariza.ariza_sayisi, 0) AS ariza_sayisi,
+                    COALESCE(durum.durum_degisim_sayisi, 0) AS durum_degisim_sayisi,
+                    CASE
+                        WHEN sk.state NOT IN ('teslim_edildi', 'iptal')
+                             AND sk.sure_asimi_tarihi <= (now() AT TIME ZONE 'UTC')
+                        THEN 1 ELSE 0
+                    END AS sure_asimi_sayisi
+                FROM servis_kaydi sk
+                LEFT JOIN urun_modeli um ON um.id = sk.urun_modeli_id
+                LEFT JOIN (
+                    SELECT servis_kaydi_id,
+                           (array_agg(ariza_tanimi_id ORDER BY id))[1] AS ariza_tanimi_id,
+                           COUNT(*) AS ariza_sayisi
+                      FROM servis_kaydi_ariza_detay
+                     GROUP BY servis_kaydi_id
+                ) ariza ON ariza.servis_kaydi_id = sk.id
+                LEFT JOIN (
+                    SELECT servis_kaydi_id,
+                           SUM(ornek_miktar) FILTER (WHERE ornek_tur = 'yedek_parca') AS parca_adedi,
+                           SUM(ornek_miktar) FILTER (WHERE ornek_tur = 'hizmet') AS hizmet_adedi
+                      FROM servis_kaydi_teknik_rapor_satir
+                     GROUP BY servis_kaydi_id
+                ) satir ON satir.servis_kaydi_id = sk.id
+                LEFT JOIN (
+                    SELECT servis_kaydi_id,
+                           COUNT(*) AS durum_degisim_sayisi,
+                           SUM(gecen_sure_saniye) FILTER (WHERE state = 'onay_bekliyor') AS onay_bekleme_sn,
+                           SUM(gecen_sure_saniye) FILTER (WHERE state = 'islemde') AS islemde_sn
+                      FROM servis_durum_satiri
+                     WHERE servis_kaydi_id IS NOT NULL
+                     GROUP BY servis_kaydi_id
+                ) durum ON durum.servis_kaydi_id = sk.id
+                LEFT JOIN (
+                    SELECT DISTINCT ON (servis_kaydi_id)
+                           servis_kaydi_id, personel_id AS teknisyen_id
+                      FROM servis_islem_satiri
+                     ORDER BY servis_kaydi_id, tarih DESC, id DESC
+                ) islem ON islem.servis_kaydi_id = sk.id
+            )
+        """)
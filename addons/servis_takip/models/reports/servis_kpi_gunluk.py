@@ -0,0 +1,189 @@
+from odoo import models, fields, api, _
+from datetime import timedelta
+
+
+class ServisKpiGunluk(models.Model):
+    _name = 'servis.kpi.gunluk'
+    _description = 'Servis Günlük KPI Görüntüsü'
+    _order = 'tarih desc, company_id'
+    _rec_name = 'tarih'
+
+    tarih = fields.Date(string='Tarih', required=True, readonly=True, index=True)
+    company_id = fields.Many2one('res.company', string='Şirket', readonly=True, index=True)
+    currency_id = fields.Many2one(related='company_id.currency_id', string='Para Birimi')
+
+    acik_sayisi = fields.Integer(string='Açık Servis (Gün Sonu)', readonly=True)
+    yeni_kayit_sayisi = fields.Integer(string='Yeni Kayıt', readonly=True)
+    teslim_sayisi = fields.Integer(string='Teslim Edilen', readonly=True)
+    sure_asimi_sayisi = fields.Integer(string='Süre Aşımı (Gün Sonu)', readonly=True)
+    ciro = fields.Monetary(string='Ciro', readonly=True, currency_field='currency_id',
+                           help='O gün teslim edilen kayıtların genel toplamı')
+    durum_ids = fields.One2many('servis.kpi.gunluk.durum', 'gunluk_id', string='Durum Bazında Açık Servis', readonly=True)
+
+    # Gün + şirket başına tek görüntü (şirketsiz kayıtlar tek grup sayılır)
+    _tarih_company_uniq = models.UniqueIndex(
+        '(tarih, COALESCE(company_id, 0))',
+        "Bu tarih ve şirket için KPI görüntüsü zaten mevcut."
+    )
+
+    @api.model
+    def _cron_gunluk_kpi(self, en_fazla_gun=31):
+        """Son görüntüden dünün sonuna kadar eksik günleri doldur
+
+        Hiç görüntü yoksa ilk servis kaydının gününden başlar; uzun geçmişler
+        her çalışmada en_fazla_gun kadar işlenir ve cron kaldığı yerden devam eder.
+        """
+        dun = fields.Date.context_today(self) - timedelta(days=1)
+        while True:
+            baslangic = self._ilk_eksik_gun()
+            if not baslangic or baslangic > dun:
+                return
+            bitis = min(baslangic + timedelta(days=en_fazla_gun - 1), dun)
+            self._gunleri_hesapla(baslangic, bitis)
+            kalan = (dun - bitis).days
+            if not self.env['ir.cron']._commit_progress((bitis - baslangic).days + 1, remaining=kalan):
+                return
+
+    @api.model
+    def _ilk_eksik_gun(self):
+        # Hareketsiz günlerde satır oluşmadığı için ilerleme ayrı bir parametrede tutulur
+        son_gun = self.env['ir.config_parameter'].sudo().get_param('servis_takip.kpi_son_gun')
+        if son_gun:
+            return fields.Date.to_date(son_gun) + timedelta(days=1)
+        self.env.cr.execute("SELECT MIN(kayit_tarihi)::date FROM servis_kaydi")
+        return self.env.cr.fetchone()[0]
+
+    @api.model
+    def _son_gunu_kaydet(self, gun):
+        param = self.env['ir.config_parameter'].sudo()
+        son_gun = fields.Date.to_date(param.get_param('servis_takip.kpi_son_gun'))
+        if not son_gun or gun > son_gun:
+            param.set_param('servis_takip.kpi_son_gun', fields.Date.to_string(gun))
+
+    @api.model
+    def _geriye_donuk_doldur(self, baslangic=None, bitis=None):
+        """Geçmiş için görüntüleri (yeniden) oluşturur; varsayılan: ilk kayıttan düne
+
+        Kabuktan: env['servis.kpi.gunluk']._geriye_donuk_doldur(date(2024, 1, 1))
+        """
+        if not baslangic:
+            self.env.cr.execute("SELECT MIN(kayit_tarihi)::date FROM servis_kaydi")
+            baslangic = self.env.cr.fetchone()[0]
+        bitis = bitis or fields.Date.context_today(self) - timedelta(days=1)
+        if not baslangic or baslangic > bitis:
+            return 0
+        return len(self._gunleri_hesapla(baslangic, bitis))
+
+    @api.model
+    def _geriye_donuk_doldurmayi_planla(self):
+        """İlerlemeyi ilk kaydın önceki gününe çeker; cron geçmişi parça parça yeniden yazar"""
+        self.env.cr.execute("SELECT MIN(kayit_tarihi)::date FROM servis_kaydi")
+        ilk_gun = self.env.cr.fetchone()[0]
+        if not ilk_gun:
+            return False
+        self.env['ir.config_parameter'].sudo().set_param(
+            'servis_takip.kpi_son_gun', fields.Date.to_string(ilk_gun - timedelta(days=1))
+        )
+        self.env.ref('servis_takip.ir_cron_servis_kpi_gunluk')._trigger()
+        return True
+
+    def action_geriye_donuk_doldur(self):
+        planlandi = self._geriye_donuk_doldurmayi_planla()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Planlandı') if planlandi else _('Bilgi'),
+                'message': _('KPI geçmişi arka planda yeniden oluşturulacak.')
+                           if planlandi else _('Henüz servis kaydı yok.'),
+                'type': 'info',
+                'sticky': False,
+            }
+        }
+
+    @api.model
+    def _gunleri_hesapla(self, baslangic, bitis):
+        """[baslangic, bitis] günlerinin görüntülerini silip yeniden yazar
+
+        Gün sınırları veritabanındaki (UTC) zaman damgalarına göredir. Gün sonu
+        durumu, gün sonunda açık olan durum satırıdır: satırlar bir sonrakinin
+        başlangıcından bir saniye önce kapandığı için tarih/bitis_tarihi aralık
+        birleşimi yeterlidir, her gün için tüm geçmiş yeniden sıralanmaz.
+        """
+        cr = self.env.cr
+        self.env.flush_all()
+        self.search([('tarih', '>=', baslangic), ('tarih', '<=', bitis)]).unlink()
+
+        # Gün sonunda açık olan kayıtlar (durum ve süre aşımı ile)
+        cr.execute("""
+            SELECT g.gun::date, sk.company_id, ds.state, COUNT(*),
+                   COUNT(*) FILTER (WHERE sk.sure_asimi_tarihi < g.gun + interval '1 day')
+              FROM generate_series(%s::date, %s::date, interval '1 day') AS g(gun)
+              JOIN servis_durum_satiri ds
+                ON ds.tarih < g.gun + interval '1 day'
+               AND (ds.bitis_tarihi IS NULL
+                    OR ds.bitis_tarihi >= g.gun + interval '1 day' - interval '1 second')
+              JOIN servis_kaydi sk ON sk.id = ds.servis_kaydi_id
+             WHERE ds.state NOT IN ('teslim_edildi', 'iptal')
+             GROUP BY g.gun, sk.company_id, ds.state
+        """, (baslangic, bitis))
+        acik = cr.fetchall()
+
+        # Gün içindeki giriş, teslim ve ciro
+        cr.execute("""
+            SELECT gun, company_id, SUM(yeni), SUM(teslim), SUM(ciro)
+              FROM (
+                    SELECT kayit_tarihi::date AS gun, company_id, 1 AS yeni, 0 AS teslim, 0 AS ciro
+                      FROM servis_kaydi
+                     WHERE kayit_tarihi >= %(bas)s AND kayit_tarihi < %(bit)s
+                    UNION ALL
+                    SELECT teslim_tarihi::date, company_id, 0, 1, COALESCE(genel_toplam, 0)
+                      FROM servis_kaydi
+                     WHERE state = 'teslim_edildi'
+                       AND teslim_tarihi >= %(bas)s AND teslim_tarihi < %(bit)s
+                   ) hareket
+             GROUP BY gun, company_id
+        """, {'bas': baslangic, 'bit': bitis + timedelta(days=1)})
+        hareketler = cr.fetchall()
+
+        gunler = {}
+
+        def _gun(tarih, company_id):
+            return gunler.setdefault((tarih, company_id), {
+                'tarih': tarih, 'company_id': company_id,
+                'acik_sayisi': 0, 'yeni_kayit_sayisi': 0, 'teslim_sayisi': 0,
+                'sure_asimi_sayisi': 0, 'ciro': 0.0, 'durum_ids': [],
+            })
+
+        for tarih, company_id, state, adet, asim in acik:
+            vals = _gun(tarih, company_id)
+            vals['acik_sayisi'] += adet
+            vals['sure_asimi_sayisi'] += asim
+            vals['durum_ids'].append(fields.Command.create({
+                'tarih': tarih, 'company_id': company_id, 'state': state, 'adet': adet,
+            }))
+        for tarih, company_id, yeni, teslim, ciro in hareketler:
+            vals = _gun(tarih, company_id)
+            vals['yeni_kayit_sayisi'] = yeni
+            vals['teslim_sayisi'] = teslim
+            vals['ciro'] = ciro
+
+        kayitlar = self.create(list(gunler.values()))
+        self._son_gunu_kaydet(bitis)
+        return kayitlar
+
+
+class ServisKpiGunlukDurum(models.Model):
+    _name = 'servis.kpi.gunluk.durum'
+    _description = 'Servis Günlük KPI - Durum Bazında Açık Servis'
+    _order = 'tarih desc, state'
+
+    gunluk_id = fields.Many2one('servis.kpi.gunluk', string='Günlük Görüntü', required=True, ondelete='cascade', index=True)
+    tarih = fields.Date(string='Tarih', required=True, readonly=True, index=True)
+    company_id = fields.Many2one('res.company', string='Şirket', readonly=True)
+    state = fields.Selection(selection='_get_durum_listesi', string='Durum', readonly=True)
+    adet = fields.Integer(string='Açık Servis', readonly=True)
+
+    @api.model
+    def _get_durum_listesi(self):
+        return list(self.env['servis.durum.tanimi']._get_durum_etiket_map().items())
@@ -1,5 +1,4 @@
 from odoo import models, fields, api
-from datetime import datetime
 import logging
 
 _logger = logging.getLogger(__name__)
@@ -10,78 +9,36 @@ class ResPartner(models.Model):
 
     cari_kod = fields.Char(
         string='Cari Kod',
-        help='Müşteri/Tedarikçi cari kod (YYYYNNNN formatı)',
-        readonly=False
+        help='Müşteri/Tedarikçi cari kod (YYYYNNNNN formatı)',
+        readonly=False,
+        copy=False
     )
 
-    @api.model
-    def default_get(self, fields_list):
-        """Form açılırken default cari kodu ata"""
-        res = super().default_get(fields_list)
-        if 'cari_kod' in fields_list:
-            res['cari_kod'] = self._get_next_cari_kod()
-        return res
+    # Aynı cari kod iki kontağa verilemez (boş kodlar serbest)
+    _cari_kod_uniq = models.UniqueIndex(
+        '(cari_kod) WHERE cari_kod IS NOT NULL',
+        "Bu cari kod başka bir kontakta kullanılıyor."
+    )
 
     @api.model
-    def _get_next_cari_kod(self):
-        """Son cari koda bakarak yeni cari kodu oluştur"""
-        current_year = datetime.now().year
-        
-        try:
-            # Tüm kontaktları cari_kod'a göre al
-            all_partners = self.search([('cari_kod', '!=', False)])
-            
-            if all_partners:
-                # Son kontağı bul (cari_kod'a göre ters sırala - integer sort)
-                # Eski (8 hane) ve yeni (9 hane) format'ları both support etmek için
-                valid_partners = []
-                for partner in all_partners:
-                    code = partner.cari_kod.strip() if partner.cari_kod else None
-                    if code and len(code) in [8, 9] and code[:4].isdigit() and code[4:].isdigit():
-                        valid_partners.append((int(code), partner))
-                
-                if valid_partners:
-                    # Integer olarak sort et (string sort karşılaştırmasından ziyade)
-                    valid_partners.sort(key=lambda x: x[0], reverse=True)
-                    last_code_int = valid_partners[0][0]
-                    last_code = str(last_code_int)
-                    last_year = int(last_code[:4])
-                    last_sequence = int(last_code[4:])
-                    
-                    # Eğer son kayıt bu yılsa +1 yap
-                    if last_year == current_year:
-                        next_sequence = last_sequence + 1
-                        return f"{current_year}{next_sequence:05d}"
-                    # Eğer geçmiş yılussa bu yıldan başla
-                    else:
-                        return f"{current_year}00001"
-                else:
-                    # Format hata, yeni formatla başla
-                    return f"{current_year}00001"
-            else:
-                # Hiç cari kod yoksa bu yıldan başla
-                return f"{current_year}00001"
-                
-        except Exception as e:
-            _logger.warning(f"Cari kod oluşturma hatası: {str(e)}")
-            return f"{current_year}0001"
+    def _get_next_cari_kod(self, adet=1):
+        """Yıllık sequence'ten (res.partner.cari.kod) cari kod ayırır
 
-    def create(self, vals_list):
-        """Yeni kontakt oluştururken cari kodu otomatik ata"""
-        try:
-            # Odoo 19: vals_list bir liste olmalı
-            if isinstance(vals_list, dict):
-                # Eğer tek dict gelmişse, listeye çevir
-                vals_list = [vals_list]
-            
-            for vals in vals_list:
-                # Eğer cari kod boşsa, otomatik ata
-                if isinstance(vals, dict) and not vals.get('cari_kod'):
-                    vals['cari_kod'] = self._get_next_cari_kod()
-            
-            return super().create(vals_list)
-        except Exception as e:
-            _logger.error(f"create() hatası: {str(e)}")
-            # Hata durumunda yine de oluştursun
-            return super().create(vals_list)
+        Numara yılın date range sayacından gelir; eşzamanlı oluşturmalar
+        PostgreSQL sequence sayesinde aynı kodu alamaz. Her zaman `adet`
+        uzunluğunda liste döner (sequence yoksa elemanlar None).
+        """
+        return self.env['ir.sequence']._next_by_code_blok('res.partner.cari.kod', adet)
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Yeni kontakt oluştururken cari kodu otomatik ata (tüm batch için tek seferde)"""
+        eksikler = [vals for vals in vals_list if not vals.get('cari_kod')]
+        if eksikler:
+            kodlar = self._get_next_cari_kod(len(eksikler))
+            for vals, kod in zip(eksikler, kodlar):
+                if kod:
+                    vals['cari_kod'] = kod
+                else:
+                    _logger.warning("Cari kod sequence'i (res.partner.cari.kod) bulunamadı.")
+        return super().create(vals_list)
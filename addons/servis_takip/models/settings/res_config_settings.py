@@ -28,4 +28,11 @@ class ResConfigSettings(models.TransientModel):
         default=21,
         config_parameter='servis_takip.servis_sure_asimi_limiti',
         help="Bu günden daha fazla süredir serviste olan cihazlar için uyarı gösterilir"
-    )
\ No newline at end of file
+    )
+
+    def set_values(self):
+        eski_limit = self.env['servis.kaydi']._get_sure_asimi_limiti()
+        super().set_values()
+        # Limit değiştiyse saklanan süre aşımı tarihlerini toplu güncelle
+        if self.env['servis.kaydi']._get_sure_asimi_limiti() != eski_limit:
+            self.env['servis.kaydi']._sure_asimi_tarihlerini_guncelle()
\ No newline at end of file
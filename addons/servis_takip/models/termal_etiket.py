@@ -0,0 +1,126 @@
+"""Yazıcıya özgü (ZPL / EPL2) termal etiket metni
+
+report_barkod_etiketi ile aynı bilgileri 10x8 cm, 203 dpi (8 nokta/mm) etikete
+yerleştirir. Fonksiyonlar yalın sözlük alır, Odoo'ya bağımlı değildir; çıktı
+doğrudan yazıcı kuyruğuna gönderilebilir veya indirilebilir.
+
+veri: {'musteri', 'telefon', 'seri_no', 'model', 'garantili', 'tarih', 'arizalar': [(tip, not), ...]}
+"""
+
+ETIKET_GENISLIK = 800   # 100 mm
+ETIKET_YUKSEKLIK = 640  # 80 mm
+KENAR = 24
+
+# EPL2 UTF-8 desteklemediği için Türkçe karakterler ASCII'ye indirgenir
+_ASCII_TABLOSU = str.maketrans('çÇğĞıİöÖşŞüÜâÂîÎûÛ', 'cCgGiIoOsSuUaAiIuU')
+
+
+def _tek_satir(metin):
+    return ' '.join(str(metin or '').split())
+
+
+def _zpl_metin(metin):
+    """^FH_ ile kullanılacak alan verisi: kontrol karakterleri onaltılık kaçışla yazılır"""
+    metin = _tek_satir(metin)
+    for karakter, kod in (('_', '_5F'), ('^', '_5E'), ('~', '_7E'), ('\\', '_5C')):
+        metin = metin.replace(karakter, kod)
+    return metin
+
+
+def _zpl_barkod(metin):
+    # Code128'de '>' alt küme değiştirici; düz '>' için '><' yazılır
+    return _zpl_metin(metin).replace('>', '><')
+
+
+def zpl_etiket(veri):
+    sag = 520
+    satirlar = [
+        '^XA',
+        '^CI28',
+        '^PW%d' % ETIKET_GENISLIK,
+        '^LL%d' % ETIKET_YUKSEKLIK,
+        '^LH0,0',
+        # Başlık: müşteri
+        '^FO%d,20^A0N,40,40^FB%d,1,0,C^FH_^FD%s^FS' % (KENAR, ETIKET_GENISLIK - 2 * KENAR, _zpl_metin(veri.get('musteri')).upper()),
+        '^FO%d,68^GB%d,3,3^FS' % (KENAR, ETIKET_GENISLIK - 2 * KENAR),
+        # Sol sütun
+        '^FO%d,86^A0N,26,26^FH_^FDYetkilisi : %s^FS' % (KENAR, _zpl_metin(veri.get('musteri'))),
+        '^FO%d,120^A0N,26,26^FH_^FDTelefon : %s^FS' % (KENAR, _zpl_metin(veri.get('telefon'))),
+        '^FO%d,160^A0N,26,26^FDSeri No :^FS' % KENAR,
+    ]
+    if veri.get('seri_no'):
+        satirlar += [
+            '^FO%d,192^BY2^BCN,100,N,N,N^FH_^FD%s^FS' % (KENAR, _zpl_barkod(veri['seri_no'])),
+            '^FO%d,300^A0N,32,32^FH_^FD%s^FS' % (KENAR, _zpl_metin(veri['seri_no'])),
+        ]
+    satirlar += [
+        '^FO%d,80^GB3,260,3^FS' % (sag - 16),
+        # Sağ sütun: model, garanti, tarih
+        '^FO%d,86^A0N,26,26^FB%d,1,0,C^FDModel :^FS' % (sag, ETIKET_GENISLIK - KENAR - sag),
+        '^FO%d,120^A0N,40,40^FB%d,2,0,C^FH_^FD%s^FS' % (sag, ETIKET_GENISLIK - KENAR - sag, _zpl_metin(veri.get('model'))),
+        '^FO%d,210^GB%d,50,50^FS' % (sag, ETIKET_GENISLIK - KENAR - sag),
+        '^FO%d,222^A0N,32,32^FR^FB%d,1,0,C^FD%s^FS' % (
+            sag, ETIKET_GENISLIK - KENAR - sag, 'GARANTİLİ' if veri.get('garantili') else 'GARANTİSİZ'),
+        '^FO%d,290^A0N,32,32^FB%d,1,0,C^FH_^FD%s^FS' % (sag, ETIKET_GENISLIK - KENAR - sag, _zpl_metin(veri.get('tarih'))),
+        # Müşteri şikayetleri
+        '^FO%d,350^GB%d,3,3^FS' % (KENAR, ETIKET_GENISLIK - 2 * KENAR),
+        '^FO%d,362^A0N,24,24^FB%d,1,0,C^FDMÜŞTERİ ŞİKAYETLERİ^FS' % (KENAR, ETIKET_GENISLIK - 2 * KENAR),
+    ]
+    arizalar = ['- %s%s' % (_zpl_metin(tip) + ': ' if tip else '', _zpl_metin(notu)) for tip, notu in veri.get('arizalar') or []]
+    if arizalar:
+        # ^FB alan bloğunda satır sonu '\&'; sığmayan satırlar kesilir
+        satirlar.append('^FO%d,396^A0N,22,22^FB%d,9,2,L^FH_^FD%s^FS' % (
+            KENAR, ETIKET_GENISLIK - 2 * KENAR, '\\&'.join(arizalar)))
+    satirlar += ['^PQ1', '^XZ']
+    return '\n'.join(satirlar) + '\n'
+
+
+def _epl_metin(metin, uzunluk=None):
+    metin = _tek_satir(metin).translate(_ASCII_TABLOSU)
+    metin = metin.encode('ascii', 'replace').decode('ascii')
+    if uzunluk:
+        metin = metin[:uzunluk]
+    return metin.replace('\\', '\\\\').replace('"', '\\"')
+
+
+def epl_etiket(veri):
+    sag = 520
+    satirlar = [
+        '',
+        'N',
+        'q%d' % ETIKET_GENISLIK,
+        'Q%d,24' % ETIKET_YUKSEKLIK,
+        'A%d,24,0,4,1,1,N,"%s"' % (KENAR, _epl_metin(veri.get('musteri'), 40).upper()),
+        'LO%d,68,%d,3' % (KENAR, ETIKET_GENISLIK - 2 * KENAR),
+        'A%d,86,0,3,1,1,N,"Yetkilisi : %s"' % (KENAR, _epl_metin(veri.get('musteri'), 22)),
+        'A%d,120,0,3,1,1,N,"Telefon : %s"' % (KENAR, _epl_metin(veri.get('telefon'), 22)),
+        'A%d,160,0,3,1,1,N,"Seri No :"' % KENAR,
+    ]
+    if veri.get('seri_no'):
+        satirlar += [
+            # 1: Code128 (otomatik alt küme), dar/geniş çubuk 2/4 nokta
+            'B%d,192,0,1,2,4,100,N,"%s"' % (KENAR, _epl_metin(veri['seri_no'])),
+            'A%d,300,0,4,1,1,N,"%s"' % (KENAR, _epl_metin(veri['seri_no'])),
+        ]
+    satirlar += [
+        'LO%d,80,3,260' % (sag - 16),
+        'A%d,86,0,3,1,1,N,"Model :"' % sag,
+        'A%d,120,0,4,1,1,N,"%s"' % (sag, _epl_metin(veri.get('model'), 15)),
+        'LO%d,210,%d,50' % (sag, ETIKET_GENISLIK - KENAR - sag),
+        'A%d,222,0,4,1,1,R,"%s"' % (sag + 16, 'GARANTILI' if veri.get('garantili') else 'GARANTISIZ'),
+        'A%d,290,0,4,1,1,N,"%s"' % (sag, _epl_metin(veri.get('tarih'))),
+        'LO%d,350,%d,3' % (KENAR, ETIKET_GENISLIK - 2 * KENAR),
+        'A%d,362,0,2,1,1,N,"MUSTERI SIKAYETLERI"' % (ETIKET_GENISLIK // 2 - 110),
+    ]
+    # EPL satır kaydırmaz: şikayet başına bir satır, sığmayanlar kesilir
+    for sira, (tip, notu) in enumerate((veri.get('arizalar') or [])[:9]):
+        metin = '- %s%s' % (tip + ': ' if tip else '', notu or '')
+        satirlar.append('A%d,%d,0,2,1,1,N,"%s"' % (KENAR, 396 + sira * 26, _epl_metin(metin, 62)))
+    satirlar.append('P1')
+    return '\n'.join(satirlar) + '\n'
+
+
+TERMAL_CIZICILER = {
+    'zpl': zpl_etiket,
+    'epl': epl_etiket,
+}
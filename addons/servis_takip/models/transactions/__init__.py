@@ -1,6 +1,9 @@
 from . import servis_urun_aktar
 from . import servis_urun
 from . import product_extensions
+from . import res_currency_rate
+from . import account_tax
+from . import res_currency
 
 
 
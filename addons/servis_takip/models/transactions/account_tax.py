@@ -0,0 +1,25 @@
+from odoo import models, api
+
+# product.template'in varsayılan vergi önbelleğini etkileyen alanlar
+VARSAYILAN_VERGI_ALANLARI = {'type_tax_use', 'amount', 'active', 'company_id', 'sequence'}
+
+
+class AccountTax(models.Model):
+    _inherit = 'account.tax'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        taxes = super().create(vals_list)
+        self.env.registry.clear_cache()
+        return taxes
+
+    def write(self, vals):
+        res = super().write(vals)
+        if VARSAYILAN_VERGI_ALANLARI.intersection(vals):
+            self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env.registry.clear_cache()
+        return res
@@ -1,30 +1,47 @@
-from odoo import models, fields, api
+from odoo import models, fields, api, tools, _
+from odoo.tools import split_every
 from datetime import date
+import json
 import logging
 
 _logger = logging.getLogger(__name__)
 
+# Kur değişen para birimleri (virgülle ayrılmış id'ler); fiyat güncelleme cron'u tüketir
+KUR_DEGISEN_PARAM = 'servis_takip.kur_degisen_para_birimleri'
+
 
 class ProductTemplate(models.Model):
     _inherit = 'product.template'
 
     def _get_default_tax_20_percent(self):
         """20% satın alma vergisini bul ve döndür"""
-        purchase_tax = self.env['account.tax'].search([
-            ('type_tax_use', '=', 'purchase'),
-            ('amount', '=', 20.0),
-            ('active', '=', True)
-        ], limit=1)
-        return purchase_tax.ids if purchase_tax else []
+        return list(self._varsayilan_vergi_idleri('purchase', self.env.company.id))
 
     def _get_default_sales_tax_20_percent(self):
         """20% satış vergisini bul ve döndür"""
-        sales_tax = self.env['account.tax'].search([
-            ('type_tax_use', '=', 'sale'),
+        return list(self._varsayilan_vergi_idleri('sale', self.env.company.id))
+
+    @api.model
+    @tools.ormcache('type_tax_use', 'company_id')
+    def _varsayilan_vergi_idleri(self, type_tax_use, company_id):
+        """Şirket için 20% vergi id'leri; önbellek account.tax değişince temizlenir"""
+        Tax = self.env['account.tax'].sudo()
+        tax = Tax.search([
+            *Tax._check_company_domain(company_id),
+            ('type_tax_use', '=', type_tax_use),
             ('amount', '=', 20.0),
             ('active', '=', True)
         ], limit=1)
-        return sales_tax.ids if sales_tax else []
+        return tuple(tax.ids)
+
+    @api.model
+    @tools.ormcache()
+    def _varsayilan_usd_id(self):
+        """USD para biriminin id'si (yoksa False); önbellek res.currency değişince temizlenir"""
+        return self.env['res.currency'].sudo().search([('name', '=', 'USD')], limit=1).id
+
+    def _default_usd(self):
+        return self.env['res.currency'].browse(self._varsayilan_usd_id())
 
     @api.model
     def default_get(self, fields_list):
@@ -64,7 +81,7 @@ class ProductTemplate(models.Model):
     custom_currency_id = fields.Many2one(
         'res.currency', 
         string="Para Birimi",
-        default=lambda self: self.env['res.currency'].search([('name', '=', 'USD')], limit=1),
+        default=lambda self: self._default_usd(),
         help="Dövizli fiyatlar için para birimi"
     )
     
@@ -110,7 +127,7 @@ class ProductTemplate(models.Model):
     custom_cost_currency_id = fields.Many2one(
         'res.currency', 
         string="Maliyet Para Birimi",
-        default=lambda self: self.env['res.currency'].search([('name', '=', 'USD')], limit=1),
+        default=lambda self: self._default_usd(),
         help="Dövizli maliyetler için para birimi"
     )
     
@@ -143,23 +160,58 @@ class ProductTemplate(models.Model):
         """Şirket para birimini döndür"""
         return self.company_id.currency_id or self.env.company.currency_id
 
+    @api.model
+    def _get_kur_orani(self, from_currency, to_currency, company, tarih):
+        """(kaynak, hedef, şirket, tarih) kurunu işlem boyunca bir kez çözer
+
+        Sonuç cursor önbelleğinde tutulur; aynı işlemdeki binlerce ürün
+        dönüşümü tek kur sorgusunu paylaşır.
+        """
+        kurlar = self.env.cr.cache.setdefault('servis_takip_kur_oranlari', {})
+        anahtar = (from_currency.id, to_currency.id, company.id, tarih)
+        if anahtar not in kurlar:
+            kurlar[anahtar] = self.env['res.currency']._get_conversion_rate(
+                from_currency, to_currency, company, tarih
+            )
+        return kurlar[anahtar]
+
     def _convert_currency(self, amount, from_currency, to_currency):
         """Para birimi dönüşümü yap - hata durumunda 0 döndür
         NOT: Display'de yuvarlama yapılır, veri tabanında kesin tutulur"""
         if not amount or not from_currency or not to_currency:
             return 0.0
+        if from_currency == to_currency:
+            return to_currency.round(amount)
         try:
-            result = from_currency._convert(
-                amount,
+            kur = self._get_kur_orani(
+                from_currency,
                 to_currency,
                 self.company_id or self.env.company,
                 date.today()
             )
-            return result
+            return to_currency.round(amount * kur)
         except Exception as e:
             _logger.warning(f"Para birimi dönüşümü başarısız: {str(e)}")
             return 0.0
 
+    def _dovize_toplu_cevir(self, tl_alani, para_alani, hedef_alan):
+        """Kayıt kümesindeki TL tutarını (tl_alani) ürünün dövizine çevirip hedef_alan'a yazar
+
+        Kurlar _get_kur_orani üzerinden paylaşıldığı için kayıt başına sadece
+        çarpma ve yuvarlama yapılır.
+        """
+        for record in self:
+            tutar = record[tl_alani]
+            doviz = record[para_alani]
+            if tutar and doviz:
+                record[hedef_alan] = record._convert_currency(
+                    tutar,
+                    record._get_company_currency(),
+                    doviz
+                )
+            else:
+                record[hedef_alan] = 0
+
     def _calculate_tax_on_amount(self, amount, taxes):
         """Vergiyi hesapla ve vergiler dahil tutarı döndür
         NOT: Display'de yuvarlama yapılır, veri tabanında kesin tutulur"""
@@ -173,11 +225,99 @@ class ProductTemplate(models.Model):
         except Exception:
             return amount
 
-    def _remove_tax_from_amount(self, amount_with_tax, taxes):
+    @api.model
+    def _vergi_dogrusal_katsayilar(self, taxes):
+        """compute_all(fiyat)['total_included'] ≈ a * fiyat + b olacak (a, b) katsayıları
+
+        Yüzde, sabit, bölme ve grup vergileri (include_base_amount zinciri dahil)
+        ile fiyata dahil yüzde/sabit vergiler için kapalı formdur; yuvarlama
+        hesaba katılmaz. Desteklenmeyen yapılarda (kod vergisi, matrahı etkileyen
+        fiyata dahil vergi vb.) None döner.
+        """
+        vergiler = taxes.flatten_taxes_hierarchy().sorted(lambda v: (v.sequence, v.id))
+        if any(v.amount_type not in ('percent', 'fixed', 'division') for v in vergiler):
+            return None
+        if any(v.amount_type == 'division' and v.amount >= 100 for v in vergiler):
+            return None
+        dahil = vergiler.filtered('price_include')
+        haric = vergiler - dahil
+        if any(v.include_base_amount or v.amount_type == 'division' for v in dahil):
+            return None
+
+        # Fiyata dahil vergiler: fiyat = matrah * (1 + oran) + sabit
+        oran = sum(v.amount / 100.0 for v in dahil if v.amount_type == 'percent')
+        sabit = sum(v.amount for v in dahil if v.amount_type == 'fixed')
+        # Hariç vergilerin matrahı: m * fiyat + c
+        m, c = 1.0 / (1.0 + oran), -sabit / (1.0 + oran)
+        # total_included = fiyat + hariç vergiler
+        a, b = 1.0, 0.0
+        for v in haric:
+            if v.amount_type == 'percent':
+                vm, vc = m * v.amount / 100.0, c * v.amount / 100.0
+            elif v.amount_type == 'division':
+                k = 1.0 / (1.0 - v.amount / 100.0) - 1.0
+                vm, vc = m * k, c * k
+            else:
+                vm, vc = 0.0, v.amount
+            a += vm
+            b += vc
+            if v.include_base_amount:
+                m += vm
+                c += vc
+        return a, b
+
+    def _remove_tax_from_amount(self, amount_with_tax, taxes, katsayilar=False):
         """Vergiler dahil tutardan vergiyi çıkar ve vergisiz tutarı döndür
-        compute_all() kullanarak Odoo'nun vergi motoruyla tutarlı sonuç al"""
+
+        Matrah kapalı formdan tek adımda bulunur, compute_all() sadece sonucu
+        doğrulamak için çağrılır. Doğrulama tutmazsa (yuvarlama, desteklenmeyen
+        vergi) iteratif yönteme düşülür. katsayilar: önceden hesaplanmış (a, b)
+        veya None; False ise burada hesaplanır.
+        """
         if not amount_with_tax or not taxes:
             return amount_with_tax
+        try:
+            if katsayilar is False:
+                katsayilar = self._vergi_dogrusal_katsayilar(taxes)
+            if katsayilar and katsayilar[0] > 0:
+                a, b = katsayilar
+                base = (amount_with_tax - b) / a
+                computed = taxes.compute_all(base, product=self)
+                if abs(computed['total_included'] - amount_with_tax) < 0.01:
+                    return round(base, 2)
+            return self._remove_tax_iteratif(amount_with_tax, taxes)
+        except Exception:
+            return amount_with_tax
+
+    def _remove_tax_toplu(self, tutar_alani, vergi_alani):
+        """Kayıt kümesi için vergisiz tutarlar: {record: tutar}
+
+        Katsayılar vergi kümesi başına bir kez hesaplanır. Desteklenen vergiler
+        ürüne bağlı olmadığı için aynı (vergi kümesi, tutar) sonucu paylaşılır.
+        """
+        katsayilar = {}
+        sonuclar = {}
+        onbellek = {}
+        for record in self:
+            tutar = record[tutar_alani]
+            vergiler = record[vergi_alani]
+            if not tutar or not vergiler:
+                sonuclar[record] = tutar
+                continue
+            anahtar = tuple(sorted(vergiler.ids))
+            if anahtar not in katsayilar:
+                katsayilar[anahtar] = self._vergi_dogrusal_katsayilar(vergiler)
+            if katsayilar[anahtar] is None:
+                # Kod vergileri ürüne bağlı olabilir, paylaşılmaz
+                sonuclar[record] = record._remove_tax_from_amount(tutar, vergiler, None)
+                continue
+            if (anahtar, tutar) not in onbellek:
+                onbellek[anahtar, tutar] = record._remove_tax_from_amount(tutar, vergiler, katsayilar[anahtar])
+            sonuclar[record] = onbellek[anahtar, tutar]
+        return sonuclar
+
+    def _remove_tax_iteratif(self, amount_with_tax, taxes):
+        """Kapalı form doğrulanamadığında kullanılan iteratif çözüm"""
         try:
             # Iterative approach: tahmin et, hesapla, karşılaştır
             # Başlangıç tahmini: basit rate hesap
@@ -229,11 +369,9 @@ class ProductTemplate(models.Model):
 
     def _inverse_price_with_tax(self):
         """Vergiler dahil satış fiyatı değiştiğinde, satış fiyatı'nı geri hesapla"""
+        bazlar = self._remove_tax_toplu('price_with_tax', 'taxes_id')
         for record in self:
-            record.list_price = record._remove_tax_from_amount(
-                record.price_with_tax,
-                record.taxes_id
-            )
+            record.list_price = bazlar[record]
 
     @api.depends('standard_price', 'supplier_taxes_id')
     def _compute_cost_with_tax(self):
@@ -246,24 +384,14 @@ class ProductTemplate(models.Model):
 
     def _inverse_cost_with_tax(self):
         """Vergiler dahil maliyet değiştiğinde, maliyet'i geri hesapla"""
+        bazlar = self._remove_tax_toplu('cost_with_tax', 'supplier_taxes_id')
         for record in self:
-            record.standard_price = record._remove_tax_from_amount(
-                record.cost_with_tax,
-                record.supplier_taxes_id
-            )
+            record.standard_price = bazlar[record]
 
     @api.depends('price_with_tax', 'custom_currency_id')
     def _compute_custom_list_price_with_tax(self):
         """Vergiler dahil satış fiyatını dövize dönüştür"""
-        for record in self:
-            if record.price_with_tax and record.custom_currency_id:
-                record.custom_list_price_with_tax = record._convert_currency(
-                    record.price_with_tax,
-                    record._get_company_currency(),
-                    record.custom_currency_id
-                )
-            else:
-                record.custom_list_price_with_tax = 0
+        self._dovize_toplu_cevir('price_with_tax', 'custom_currency_id', 'custom_list_price_with_tax')
 
     def _inverse_custom_list_price_with_tax(self):
         """Döviz cinsinden vergiler dahil fiyat değişirse, TL'ye çevir"""
@@ -278,15 +406,7 @@ class ProductTemplate(models.Model):
     @api.depends('cost_with_tax', 'custom_cost_currency_id')
     def _compute_custom_cost_price_with_tax(self):
         """Vergiler dahil maliyeti dövize dönüştür"""
-        for record in self:
-            if record.cost_with_tax and record.custom_cost_currency_id:
-                record.custom_cost_price_with_tax = record._convert_currency(
-                    record.cost_with_tax,
-                    record._get_company_currency(),
-                    record.custom_cost_currency_id
-                )
-            else:
-                record.custom_cost_price_with_tax = 0
+        self._dovize_toplu_cevir('cost_with_tax', 'custom_cost_currency_id', 'custom_cost_price_with_tax')
 
     def _inverse_custom_cost_price_with_tax(self):
         """Döviz cinsinden vergiler dahil maliyet değişirse, TL'ye çevir"""
@@ -301,15 +421,7 @@ class ProductTemplate(models.Model):
     @api.depends('list_price', 'custom_currency_id')
     def _compute_custom_list_price(self):
         """Satış fiyatını dövize dönüştür"""
-        for record in self:
-            if record.list_price and record.custom_currency_id:
-                record.custom_list_price = record._convert_currency(
-                    record.list_price,
-                    record._get_company_currency(),
-                    record.custom_currency_id
-                )
-            else:
-                record.custom_list_price = 0
+        self._dovize_toplu_cevir('list_price', 'custom_currency_id', 'custom_list_price')
 
     def _inverse_custom_list_price(self):
         """Döviz cinsinden satış fiyatı değişirse, TL'ye çevir"""
@@ -324,15 +436,7 @@ class ProductTemplate(models.Model):
     @api.depends('standard_price', 'custom_cost_currency_id')
     def _compute_custom_cost_price(self):
         """Maliyeti dövize dönüştür"""
-        for record in self:
-            if record.standard_price and record.custom_cost_currency_id:
-                record.custom_cost_price = record._convert_currency(
-                    record.standard_price,
-                    record._get_company_currency(),
-                    record.custom_cost_currency_id
-                )
-            else:
-                record.custom_cost_price = 0
+        self._dovize_toplu_cevir('standard_price', 'custom_cost_currency_id', 'custom_cost_price')
 
     def _inverse_custom_cost_price(self):
         """Döviz cinsinden maliyet değişirse, TL'ye çevir"""
@@ -600,19 +704,19 @@ class ProductTemplate(models.Model):
 
     # ==================== CREATE / WRITE METODLAR ====================
 
-    @api.model
+    @api.model_create_multi
     def create(self, vals_list):
         """Ürün oluştururken default vergileri ayarla"""
+        sales_taxes = self._get_default_sales_tax_20_percent()
+        purchase_taxes = self._get_default_tax_20_percent()
         for vals in vals_list:
             if 'taxes_id' not in vals or not vals.get('taxes_id'):
-                default_taxes = self._get_default_sales_tax_20_percent()
-                if default_taxes:
-                    vals['taxes_id'] = [(6, 0, default_taxes)]
+                if sales_taxes:
+                    vals['taxes_id'] = [(6, 0, sales_taxes)]
             
             if 'supplier_taxes_id' not in vals or not vals.get('supplier_taxes_id'):
-                default_taxes = self._get_default_tax_20_percent()
-                if default_taxes:
-                    vals['supplier_taxes_id'] = [(6, 0, default_taxes)]
+                if purchase_taxes:
+                    vals['supplier_taxes_id'] = [(6, 0, purchase_taxes)]
         
         return super().create(vals_list)
 
@@ -701,3 +805,140 @@ class ProductTemplate(models.Model):
                 'sticky': False,
             }
         }
+
+    # ==================== TOPLU DÖNÜŞÜM (LİSTE / CRON) ====================
+
+    def _tl_fiyatlarini_dovizden_guncelle(self, parca_boyutu=1000, sql_ile=False):
+        """Dövizli satış/maliyet fiyatı olan ürünlerin TL fiyatlarını güncel kurla yeniden hesaplar
+
+        Kurlar (para birimi, şirket) başına bir kez çözülür. Satış fiyatları aynı
+        değeri alan ürünler gruplanarak write() ile yazılır; sql_ile=True (yalnızca
+        cron) iken parça başına tek UPDATE kullanılır, bağımlı alanlar yine ORM
+        tarafından yeniden hesaplanır.
+        Dönüş: {'urun_sayisi': değişen ürün, 'satis_farki': TL, 'maliyet_farki': TL}
+        """
+        ozet = {'urun_sayisi': 0, 'satis_farki': 0.0, 'maliyet_farki': 0.0}
+        for parca_ids in split_every(parca_boyutu, self.ids):
+            urunler = self.browse(parca_ids)
+            yeni_satis = {}
+            degisen_ids = set()
+            for urun in urunler:
+                tl = urun._get_company_currency()
+                if urun.custom_list_price and urun.custom_currency_id:
+                    yeni = urun._convert_currency(urun.custom_list_price, urun.custom_currency_id, tl)
+                    if tl.compare_amounts(yeni, urun.list_price):
+                        ozet['satis_farki'] += yeni - urun.list_price
+                        yeni_satis[urun.id] = yeni
+                        degisen_ids.add(urun.id)
+                if urun.custom_cost_price and urun.custom_cost_currency_id:
+                    yeni = urun._convert_currency(urun.custom_cost_price, urun.custom_cost_currency_id, tl)
+                    if tl.compare_amounts(yeni, urun.standard_price):
+                        ozet['maliyet_farki'] += yeni - urun.standard_price
+                        # standard_price şirkete bağlı alan, ORM üzerinden yazılır
+                        urun.standard_price = yeni
+                        degisen_ids.add(urun.id)
+
+            if yeni_satis and not sql_ile:
+                gruplar = {}
+                for urun_id, yeni in yeni_satis.items():
+                    gruplar.setdefault(yeni, []).append(urun_id)
+                for yeni, urun_ids in gruplar.items():
+                    self.browse(urun_ids).write({'list_price': yeni})
+            elif yeni_satis:
+                self.env.cr.execute(
+                    "UPDATE product_template SET list_price = (%s::jsonb ->> id::text)::numeric WHERE id = ANY(%s)",
+                    (json.dumps({str(k): v for k, v in yeni_satis.items()}), list(yeni_satis))
+                )
+                guncellenen = self.browse(list(yeni_satis))
+                guncellenen.invalidate_recordset(['list_price'])
+                guncellenen.modified(['list_price'])
+
+            ozet['urun_sayisi'] += len(degisen_ids)
+            self.env.flush_all()
+            # Bellek şişmesin: her parçadan sonra cache'i boşalt
+            self.env.invalidate_all()
+        return ozet
+
+    def _doviz_fiyatlarini_tlden_guncelle(self, parca_boyutu=1000):
+        """TL fiyatlardan dövizli alanları (custom_*) parça parça yeniden hesaplar"""
+        alanlar = [self._fields[fname] for fname in (
+            'custom_list_price', 'custom_list_price_with_tax',
+            'custom_cost_price', 'custom_cost_price_with_tax',
+        )]
+        for parca_ids in split_every(parca_boyutu, self.ids):
+            urunler = self.browse(parca_ids)
+            for alan in alanlar:
+                self.env.add_to_compute(alan, urunler)
+            self.env.flush_all()
+            self.env.invalidate_all()
+        return len(self)
+
+    @api.model
+    def _cron_dovizli_fiyatlari_guncelle(self):
+        """Kuru değişen para birimlerini kullanan ürünlerin TL fiyatlarını güncelle"""
+        param = self.env['ir.config_parameter'].sudo()
+        para_ids = [int(x) for x in (param.get_param(KUR_DEGISEN_PARAM) or '').split(',') if x]
+        if not para_ids:
+            return
+        # Çalışma sırasında gelen yeni kurlar parametreyi tekrar doldurur
+        param.set_param(KUR_DEGISEN_PARAM, '')
+
+        urunler = self.with_context(active_test=False).search([
+            '|',
+            ('custom_currency_id', 'in', para_ids),
+            ('custom_cost_currency_id', 'in', para_ids),
+        ], order='id')
+        ozet = {'urun_sayisi': 0, 'satis_farki': 0.0, 'maliyet_farki': 0.0}
+        kalan = len(urunler)
+        for parca_ids in split_every(1000, urunler.ids):
+            parca_ozeti = self.browse(parca_ids)._tl_fiyatlarini_dovizden_guncelle(sql_ile=True)
+            for anahtar, deger in parca_ozeti.items():
+                ozet[anahtar] += deger
+            kalan -= len(parca_ids)
+            if not self.env['ir.cron']._commit_progress(len(parca_ids), remaining=kalan) and kalan:
+                # Süre doldu; işlenenler bir sonraki çalışmada değişmeden geçilir
+                self.env['res.currency.rate']._dovizli_fiyat_guncellemesi_planla(para_ids)
+                break
+
+        _logger.info(
+            "Kur güncellemesi sonrası %s ürünün TL fiyatı değişti "
+            "(satış farkı toplamı: %.2f, maliyet farkı toplamı: %.2f)",
+            ozet['urun_sayisi'], ozet['satis_farki'], ozet['maliyet_farki'],
+        )
+        return ozet
+
+    def action_convert_döviz_to_tl_toplu(self):
+        """Liste görünümü için: seçili ürünlerin TL fiyatlarını dövizden toplu hesapla"""
+        self.check_access('write')
+        ozet = self._tl_fiyatlarini_dovizden_guncelle()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Başarılı'),
+                'message': _(
+                    'Dövizden TL\'ye Dönüşüm Tamamlandı: %(adet)s / %(toplam)s ürün değişti '
+                    '(satış farkı %(satis).2f, maliyet farkı %(maliyet).2f)',
+                    adet=ozet['urun_sayisi'], toplam=len(self),
+                    satis=ozet['satis_farki'], maliyet=ozet['maliyet_farki'],
+                ),
+                'type': 'success',
+                'sticky': False,
+            }
+        }
+
+    def action_convert_tl_to_döviz_toplu(self):
+        """Liste görünümü için: seçili ürünlerin döviz fiyatlarını TL'den toplu hesapla"""
+        # Hesaplanan alanlar write() dışında yazıldığı için yetki burada denetlenir
+        self.check_access('write')
+        adet = self._doviz_fiyatlarini_tlden_guncelle()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Başarılı'),
+                'message': _('TL\'den Dövize Dönüşüm Tamamlandı (%s ürün)') % adet,
+                'type': 'success',
+                'sticky': False,
+            }
+        }
@@ -0,0 +1,23 @@
+from odoo import models, api
+
+
+class ResCurrency(models.Model):
+    _inherit = 'res.currency'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        currencies = super().create(vals_list)
+        self.env.registry.clear_cache()
+        return currencies
+
+    def write(self, vals):
+        res = super().write(vals)
+        # product.template'in USD varsayılanı önbelleği
+        if {'name', 'active'}.intersection(vals):
+            self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env.registry.clear_cache()
+        return res
@@ -0,0 +1,31 @@
+from odoo import models, api
+
+from .product_extensions import KUR_DEGISEN_PARAM
+
+
+class ResCurrencyRate(models.Model):
+    _inherit = 'res.currency.rate'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        rates = super().create(vals_list)
+        rates._dovizli_fiyat_guncellemesi_planla()
+        return rates
+
+    def write(self, vals):
+        res = super().write(vals)
+        if {'rate', 'company_rate', 'inverse_company_rate', 'name', 'currency_id'}.intersection(vals):
+            self._dovizli_fiyat_guncellemesi_planla()
+        return res
+
+    @api.model
+    def _dovizli_fiyat_guncellemesi_planla(self, para_ids=None):
+        """Kuru değişen para birimlerini biriktir ve fiyat güncelleme cron'unu tetikle"""
+        para_ids = set(para_ids or self.currency_id.ids)
+        if not para_ids:
+            return
+        param = self.env['ir.config_parameter'].sudo()
+        mevcut = {int(x) for x in (param.get_param(KUR_DEGISEN_PARAM) or '').split(',') if x}
+        if not para_ids <= mevcut:
+            param.set_param(KUR_DEGISEN_PARAM, ','.join(str(i) for i in sorted(mevcut | para_ids)))
+        self.env.ref('servis_takip.ir_cron_dovizli_fiyat_guncelle')._trigger()
@@ -2,6 +2,12 @@ from odoo import models, fields, api
 from datetime import date
 from dateutil.relativedelta import relativedelta
 from odoo.exceptions import ValidationError
+import re
+
+
+def seri_no_normalize(seri_no):
+    """Seri numarasını karşılaştırma için normalize et (boşluksuz, büyük harf)"""
+    return re.sub(r'\s+', '', seri_no or '').upper() or False
 
 class ServisUrun(models.Model):
     _name = 'servis.urun'
@@ -11,14 +17,13 @@ class ServisUrun(models.Model):
     def _onchange_duplicate_product_check(self):
         # Dört alanın da dolu olduğundan emin olalım
         if self.tur_id and self.marka_id and self.model_id and self.serial_no:
-            # ÖNEMLİ: Arama yaparken nesnelerin .id değerlerini kullanıyoruz
-            existing_record = self.search([
-                ('tur_id', '=', self.tur_id.id),
-                ('marka_id', '=', self.marka_id.id),
-                ('model_id', '=', self.model_id.id),
-                ('serial_no', '=', self.serial_no),
-                ('id', '!=', self.id if self.id else False)
-            ], limit=1)
+            existing_record = self._urun_parki_bul(
+                self.tur_id.id,
+                self.serial_no,
+                marka_id=self.marka_id.id,
+                model_id=self.model_id.id,
+                haric_id=self._origin.id,
+            )
 
             if existing_record:
                 return {
@@ -27,28 +32,70 @@ class ServisUrun(models.Model):
                         'message': "Bu Tür, Marka, Model ve Seri Numarasına sahip bir ürün zaten sistemde kayıtlı!",
                     }
                 }
-    
-    @api.constrains('tur_id', 'marka_id', 'model_id', 'serial_no')
-    def _check_unique_product(self):
-        for record in self:
-            # Tüm alanlar doluysa kontrol et
-            if record.tur_id and record.marka_id and record.model_id and record.serial_no:
-                # Veritabanında aynı kombinasyonu ara (kendisi hariç)
-                exists = self.search([
-                    ('tur_id', '=', record.tur_id.id),
-                    ('marka_id', '=', record.marka_id.id),
-                    ('model_id', '=', record.model_id.id),
-                    ('serial_no', '=', record.serial_no),
-                    ('id', '!=', record.id)
-                ], limit=1)
-                
-                if exists:
-                    # ValidationError fırlatmak işlemi tamamen durdurur, kaydetmez
-                    raise ValidationError((
-                        "KAYIT ENGELLENDİ!\n"
-                        "Bu Tür, Marka, Model ve Seri Numarasına sahip bir ürün zaten sistemde mevcut. "
-                        "Mükerrer kayıt oluşturamazsınız."
-                    ))
+
+    # Mükerrer ürün engeli veritabanında: Tür + Marka + Model + normalize Seri No
+    # (Arşivlenmiş ürünler kontrol dışı, ORM aramalarıyla aynı davranış)
+    _urun_parki_uniq = models.UniqueIndex(
+        '(seri_no_normalize, tur_id, marka_id, model_id) WHERE active IS TRUE',
+        "KAYIT ENGELLENDİ!\n"
+        "Bu Tür, Marka, Model ve Seri Numarasına sahip bir ürün zaten sistemde mevcut. "
+        "Mükerrer kayıt oluşturamazsınız.",
+    )
+
+    @api.model
+    def _urun_parki_domain(self, tur_id, serial_no, marka_id=None, model_id=None):
+        """Ürün Parkı eşleşme domain'i (normalize seri no indeksini kullanır)"""
+        domain = [
+            ('seri_no_normalize', '=', seri_no_normalize(serial_no)),
+            ('tur_id', '=', tur_id),
+        ]
+        if marka_id:
+            domain.append(('marka_id', '=', marka_id))
+        if model_id:
+            domain.append(('model_id', '=', model_id))
+        return domain
+
+    @api.model
+    def _urun_parki_bul(self, tur_id, serial_no, marka_id=None, model_id=None, haric_id=None):
+        """Tek ürün için Ürün Parkı kaydını getir (yoksa boş recordset)"""
+        if not tur_id or not seri_no_normalize(serial_no):
+            return self.browse()
+        domain = self._urun_parki_domain(tur_id, serial_no, marka_id=marka_id, model_id=model_id)
+        if haric_id:
+            domain.append(('id', '!=', haric_id))
+        return self.search(domain, limit=1)
+
+    @api.model
+    def _urun_parki_anahtari(self, tur_id, marka_id, model_id, serial_no):
+        """Toplu aramada sonuç sözlüğünün anahtarı"""
+        return (tur_id, marka_id, model_id, seri_no_normalize(serial_no))
+
+    @api.model
+    def _urun_parki_toplu_bul(self, anahtarlar):
+        """Birden çok (tur_id, marka_id, model_id, serial_no) için tek sorguda arama yap
+
+        Dönüş: {_urun_parki_anahtari(...): servis.urun kaydı} (sadece bulunanlar)
+        """
+        anahtarlar = {self._urun_parki_anahtari(*anahtar) for anahtar in anahtarlar}
+        anahtarlar = {anahtar for anahtar in anahtarlar if all(anahtar)}
+        if not anahtarlar:
+            return {}
+
+        tur_ids, marka_ids, model_ids, seriler = (set(kolon) for kolon in zip(*anahtarlar))
+        urunler = self.search([
+            ('seri_no_normalize', 'in', list(seriler)),
+            ('tur_id', 'in', list(tur_ids)),
+            ('marka_id', 'in', list(marka_ids)),
+            ('model_id', 'in', list(model_ids)),
+        ])
+
+        sonuc = {}
+        for urun in urunler:
+            anahtar = (urun.tur_id.id, urun.marka_id.id, urun.model_id.id, urun.seri_no_normalize)
+            if anahtar in anahtarlar:
+                sonuc.setdefault(anahtar, urun)
+        return sonuc
+
     # *Ürün Kodu: Sequence ile otomatik artan
     name = fields.Char(string='Ürün Kodu', required=True, copy=False, readonly=True, index=True, default='Yeni')
     active = fields.Boolean(default=True)
@@ -60,10 +107,22 @@ class ServisUrun(models.Model):
     
     # *Seri No ve Diğerleri
     serial_no = fields.Char(string='Seri No', required=True)
+    seri_no_normalize = fields.Char(
+        string='Normalize Seri No',
+        compute='_compute_seri_no_normalize',
+        store=True,
+        readonly=True,
+        help='Boşlukları atılmış, büyük harfe çevrilmiş seri no (mükerrer kontrolü ve arama için)'
+    )
     barcode = fields.Char(string='Barkod No')
     location = fields.Char(string='Lokasyon')
 
     etiket_ids = fields.Many2many('servis.etiket', string='Etiketler')
+
+    @api.depends('serial_no')
+    def _compute_seri_no_normalize(self):
+        for record in self:
+            record.seri_no_normalize = seri_no_normalize(record.serial_no)
     
     # Müşteri Bilgileri
     musteri_tipi = fields.Selection([
@@ -149,14 +208,13 @@ class ServisUrun(models.Model):
             }
 
     # Ürün Kodu Otomatik Artış (URN0000001)
+    @api.model_create_multi
     def create(self, vals_list):
-        if not isinstance(vals_list, list):
-            vals_list = [vals_list]
-        for vals in vals_list:
-            if isinstance(vals, dict):
-                if vals.get('name', 'Yeni') == 'Yeni':
-                    vals['name'] = self.env['ir.sequence'].next_by_code('servis.urun.sequence') or 'Yeni'
+        # Kodu olmayan satırlar için sequence numaralarını tek seferde ayır
+        kodsuzlar = [vals for vals in vals_list if vals.get('name', 'Yeni') == 'Yeni']
+        kodlar = self.env['ir.sequence']._next_by_code_blok('servis.urun.sequence', len(kodsuzlar))
+        for vals, kod in zip(kodsuzlar, kodlar):
+            vals['name'] = kod or 'Yeni'
         return super(ServisUrun, self).create(vals_list)
     
     
-
@@ -0,0 +1,59 @@
+/** @odoo-module **/
+
+import { Component, onWillStart, useState } from "@odoo/owl";
+import { registry } from "@web/core/registry";
+import { rpc } from "@web/core/network/rpc";
+import { user } from "@web/core/user";
+import { useService } from "@web/core/utils/hooks";
+import { serializeDate } from "@web/core/l10n/dates";
+import { formatFloat } from "@web/views/fields/formatters";
+
+const { DateTime } = luxon;
+
+/**
+ * Servis Yönetimi Dashboard'u: göstergeler /servis_takip/dashboard/kpi
+ * uç noktasından okunur, açılışta kayıt (TransientModel) oluşturulmaz.
+ */
+export class ServisDashboard extends Component {
+    static template = "servis_takip.ServisDashboard";
+    static props = ["*"];
+
+    setup() {
+        this.action = useService("action");
+        this.orm = useService("orm");
+        const bugun = DateTime.local();
+        this.state = useState({
+            date_from: serializeDate(bugun.minus({ days: 30 })),
+            date_to: serializeDate(bugun),
+            kpi: {},
+        });
+        onWillStart(() => this.yukle());
+    }
+
+    async yukle() {
+        this.state.kpi = await rpc("/servis_takip/dashboard/kpi", {
+            date_from: this.state.date_from,
+            date_to: this.state.date_to,
+            company_id: user.activeCompany.id,
+        });
+    }
+
+    async onTarihDegisti(alan, ev) {
+        this.state[alan] = ev.target.value;
+        await this.yukle();
+    }
+
+    tutar(deger) {
+        return formatFloat(deger || 0, { digits: [false, 2] });
+    }
+
+    async onTrendGrafigi() {
+        const action = await this.orm.call("servis.dashboard", "kpi_trend_aksiyonu", [
+            this.state.date_from,
+            this.state.date_to,
+        ]);
+        await this.action.doAction(action);
+    }
+}
+
+registry.category("actions").add("servis_takip.dashboard", ServisDashboard);
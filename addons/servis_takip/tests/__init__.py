@@ -0,0 +1,2 @@
+from . import test_servis_form_gonderim
+from . import test_termal_etiket
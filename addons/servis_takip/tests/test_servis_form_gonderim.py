@@ -0,0 +1,131 @@
+import logging
+from time import monotonic, sleep
+from unittest.mock import patch
+
+from odoo import fields
+from odoo.tests import TransactionCase, tagged
+
+_logger = logging.getLogger(__name__)
+
+SAHTE_PDF = b'%PDF-1.4\n% servis_takip test\n'
+
+
+class SahteSmtp:
+    """Yerel SMTP yerine geçen oturum: mesajları toplar, sabit gecikme ekler"""
+
+    def __init__(self, gecikme=0.0, hata=None):
+        self.gecikme = gecikme
+        self.hata = hata
+        self.mesajlar = []
+        self.baglanti_sayisi = 0
+
+    def baglan(self, *args, **kwargs):
+        self.baglanti_sayisi += 1
+        return self
+
+    def send_message(self, message, smtp_from=None, smtp_to_list=None, *args, **kwargs):
+        if self.hata:
+            raise self.hata
+        sleep(self.gecikme)
+        self.mesajlar.append(message)
+        return {}
+
+    def quit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+@tagged('post_install', '-at_install')
+class TestServisFormGonderim(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        if not cls.env['hr.employee'].search([], limit=1):
+            cls.env['hr.employee'].create({'name': 'Test Teknisyen'})
+        cls.musteri = cls.env['res.partner'].create({
+            'name': 'Test Müşteri',
+            'email': 'musteri@example.com',
+        })
+        cls.servis_kayitlari = cls.env['servis.kaydi'].with_context(skip_required_check=True).create([
+            {'musteri_id': cls.musteri.id} for _i in range(20)
+        ])
+        cls.Gonderim = cls.env['servis.form.gonderim']
+
+    def _kuyruga_al(self, kayitlar, form_tipleri=('kabul',)):
+        return self.Gonderim._kuyruga_ekle_toplu([
+            (kayit, list(form_tipleri), self.musteri.email) for kayit in kayitlar
+        ])
+
+    def _sahte_ortam(self, smtp):
+        """PDF üretimini ve SMTP bağlantısını yerel sahtelerle değiştirir"""
+        MailServer = type(self.env['ir.mail_server'])
+        FormPdf = type(self.env['servis.form.pdf'])
+        return [
+            patch.object(MailServer, '_is_test_mode', lambda self: False),
+            patch.object(MailServer, 'connect', lambda self, *a, **k: smtp.baglan(*a, **k)),
+            patch.object(FormPdf, '_pdf_al_toplu', lambda self, kayitlar, form_tipi, parca_boyutu=50: {
+                kayit.id: SAHTE_PDF for kayit in kayitlar
+            }),
+        ]
+
+    def _isle(self, isler, smtp):
+        yamalar = self._sahte_ortam(smtp)
+        for yama in yamalar:
+            yama.start()
+        try:
+            return isler._isle()
+        finally:
+            for yama in yamalar:
+                yama.stop()
+
+    def test_kuyruga_ekleme_gondermez(self):
+        isler = self._kuyruga_al(self.servis_kayitlari[:2], ('kabul', 'teslim'))
+        self.assertEqual(len(isler), 4)
+        self.assertEqual(set(isler.mapped('durum')), {'bekliyor'})
+        self.assertFalse(isler.mail_id)
+        self.assertFalse(isler.attachment_id)
+
+    def test_toplu_gonderim_verimi(self):
+        """20 iş tek partide tek SMTP bağlantısıyla gönderilir; verim loglanır"""
+        smtp = SahteSmtp(gecikme=0.01)
+        isler = self._kuyruga_al(self.servis_kayitlari)
+
+        baslangic = monotonic()
+        self.assertTrue(self._isle(isler, smtp))
+        sure = monotonic() - baslangic
+        _logger.info("Form gönderim verimi: %s e-posta / %.2f sn (%.1f e-posta/sn)",
+                     len(smtp.mesajlar), sure, len(smtp.mesajlar) / sure)
+
+        self.assertEqual(set(isler.mapped('durum')), {'gonderildi'})
+        self.assertEqual(len(smtp.mesajlar), len(isler))
+        self.assertEqual(smtp.baglanti_sayisi, 1)
+        self.assertTrue(all(is_.parti_suresi_payi > 0 for is_ in isler))
+        self.assertEqual(isler.mapped('deneme_sayisi'), [1] * len(isler))
+
+    def test_ayni_form_tekrar_gonderilince_ek_paylasilir(self):
+        kayit = self.servis_kayitlari[0]
+        ilk = self._kuyruga_al(kayit)
+        ikinci = self._kuyruga_al(kayit)
+        self._isle(ilk | ikinci, SahteSmtp())
+        self.assertEqual(ilk.attachment_id, ikinci.attachment_id)
+
+    def test_smtp_hatasi_tekrar_planlanir(self):
+        smtp = SahteSmtp(hata=ConnectionRefusedError('SMTP kapalı'))
+        is_ = self._kuyruga_al(self.servis_kayitlari[0])
+        once = fields.Datetime.now()
+
+        self.assertFalse(self._isle(is_, smtp))
+        self.assertEqual(is_.durum, 'bekliyor')
+        self.assertEqual(is_.deneme_sayisi, 1)
+        self.assertTrue(is_.son_hata)
+        self.assertGreaterEqual(is_.planlanan_tarih, once)
+        mail, ek = is_.mail_id, is_.attachment_id
+
+        # Sonraki deneme aynı ek ve e-postayı kullanır
+        self.assertTrue(self._isle(is_, SahteSmtp()))
+        self.assertEqual(is_.durum, 'gonderildi')
+        self.assertEqual(is_.deneme_sayisi, 2)
+        self.assertEqual((is_.mail_id, is_.attachment_id), (mail, ek))
@@ -0,0 +1,106 @@
+from odoo.tests import BaseCase, tagged
+
+from odoo.addons.servis_takip.models.termal_etiket import epl_etiket, zpl_etiket
+
+VERI = {
+    'musteri': 'Çağrı Şeker',
+    'telefon': '0555 123 45 67',
+    'seri_no': 'SN_1^2~3\\4>5',
+    'model': 'X"Pro" 5',
+    'garantili': True,
+    'tarih': '18.10.2026',
+    'arizalar': [('Ekran', 'Kırık "cam"'), ('', None)],
+}
+
+BEKLENEN_ZPL = '''\
+^XA
+^CI28
+^PW800
+^LL640
+^LH0,0
+^FO24,20^A0N,40,40^FB752,1,0,C^FH_^FDÇAĞRI ŞEKER^FS
+^FO24,68^GB752,3,3^FS
+^FO24,86^A0N,26,26^FH_^FDYetkilisi : Çağrı Şeker^FS
+^FO24,120^A0N,26,26^FH_^FDTelefon : 0555 123 45 67^FS
+^FO24,160^A0N,26,26^FDSeri No :^FS
+^FO24,192^BY2^BCN,100,N,N,N^FH_^FDSN_5F1_5E2_7E3_5C4><5^FS
+^FO24,300^A0N,32,32^FH_^FDSN_5F1_5E2_7E3_5C4>5^FS
+^FO504,80^GB3,260,3^FS
+^FO520,86^A0N,26,26^FB256,1,0,C^FDModel :^FS
+^FO520,120^A0N,40,40^FB256,2,0,C^FH_^FDX"Pro" 5^FS
+^FO520,210^GB256,50,50^FS
+^FO520,222^A0N,32,32^FR^FB256,1,0,C^FDGARANTİLİ^FS
+^FO520,290^A0N,32,32^FB256,1,0,C^FH_^FD18.10.2026^FS
+^FO24,350^GB752,3,3^FS
+^FO24,362^A0N,24,24^FB752,1,0,C^FDMÜŞTERİ ŞİKAYETLERİ^FS
+^FO24,396^A0N,22,22^FB752,9,2,L^FH_^FD- Ekran: Kırık "cam"\\&- ^FS
+^PQ1
+^XZ
+'''
+
+BEKLENEN_EPL = '''\
+
+N
+q800
+Q640,24
+A24,24,0,4,1,1,N,"CAGRI SEKER"
+LO24,68,752,3
+A24,86,0,3,1,1,N,"Yetkilisi : Cagri Seker"
+A24,120,0,3,1,1,N,"Telefon : 0555 123 45 67"
+A24,160,0,3,1,1,N,"Seri No :"
+B24,192,0,1,2,4,100,N,"SN_1^2~3\\\\4>5"
+A24,300,0,4,1,1,N,"SN_1^2~3\\\\4>5"
+LO504,80,3,260
+A520,86,0,3,1,1,N,"Model :"
+A520,120,0,4,1,1,N,"X\\"Pro\\" 5"
+LO520,210,256,50
+A536,222,0,4,1,1,R,"GARANTILI"
+A520,290,0,4,1,1,N,"18.10.2026"
+LO24,350,752,3
+A290,362,0,2,1,1,N,"MUSTERI SIKAYETLERI"
+A24,396,0,2,1,1,N,"- Ekran: Kirik \\"cam\\""
+A24,422,0,2,1,1,N,"-"
+P1
+'''
+
+
+@tagged('post_install', '-at_install')
+class TestTermalEtiket(BaseCase):
+    """ZPL/EPL çıktısı yalın sözlükten üretilir; yazıcı olmadan metin karşılaştırılır"""
+
+    def test_zpl_cikti(self):
+        self.assertEqual(zpl_etiket(VERI), BEKLENEN_ZPL)
+
+    def test_epl_cikti(self):
+        self.assertEqual(epl_etiket(VERI), BEKLENEN_EPL)
+
+    def test_zpl_kacis_ve_code128(self):
+        cikti = zpl_etiket(dict(VERI, seri_no='A_B^C~D\\E>F'))
+        # ^FH_ kaçışı: _ ^ ~ \ onaltılık yazılır; barkodda '>' ayrıca '><' olur
+        self.assertIn('^BCN,100,N,N,N^FH_^FDA_5FB_5EC_7ED_5CE><F^FS', cikti)
+        self.assertIn('^FH_^FDA_5FB_5EC_7ED_5CE>F^FS', cikti)
+
+    def test_epl_ascii_ve_tirnak(self):
+        cikti = epl_etiket(dict(VERI, model='Gümüş "İnce"'))
+        self.assertIn('A520,120,0,4,1,1,N,"Gumus \\"Ince\\""', cikti)
+        cikti.encode('ascii')
+
+    def test_ariza_kesme(self):
+        arizalar = [('Tip%d' % i, 'x' * 100) for i in range(12)]
+        veri = dict(VERI, arizalar=arizalar)
+
+        # EPL: en fazla 9 satır, her satır 62 karakter
+        epl_satirlari = [s for s in epl_etiket(veri).splitlines() if s.startswith('A24,') and '"- ' in s]
+        self.assertEqual(len(epl_satirlari), 9)
+        self.assertEqual(epl_satirlari[0], 'A24,396,0,2,1,1,N,"- Tip0: %s"' % ('x' * 54))
+        self.assertEqual(epl_satirlari[-1].split(',')[1], str(396 + 8 * 26))
+
+        # ZPL: tek alan bloğu, 9 satırla sınırlı (^FB...,9), satırlar '\&' ile ayrılır
+        zpl_satiri = [s for s in zpl_etiket(veri).splitlines() if s.startswith('^FO24,396')][0]
+        self.assertIn('^FB752,9,2,L^FH_^FD', zpl_satiri)
+        self.assertEqual(zpl_satiri.count('\\&'), len(arizalar) - 1)
+
+    def test_seri_no_yoksa_barkod_yok(self):
+        veri = dict(VERI, seri_no=False)
+        self.assertNotIn('^BC', zpl_etiket(veri))
+        self.assertFalse([s for s in epl_etiket(veri).splitlines() if s.startswith('B')])
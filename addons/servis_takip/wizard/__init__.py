@@ -1,2 +1,4 @@
 from . import servis_formu_gonder_wizard
 from . import imza_al_wizard
+from . import servis_etiket_yazdir_wizard
+from . import servis_formu_toplu_gonder_wizard
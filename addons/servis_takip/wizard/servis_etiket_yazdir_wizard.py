@@ -0,0 +1,49 @@
+from odoo import models, fields, api
+from odoo.exceptions import UserError
+
+
+class ServisEtiketYazdirWizard(models.TransientModel):
+    _name = 'servis.etiket.yazdir.wizard'
+    _description = 'Toplu Barkod Etiketi Yazdırma'
+
+    servis_kaydi_ids = fields.Many2many('servis.kaydi', string='Servis Kayıtları')
+    kayit_sayisi = fields.Integer(string='Etiket Sayısı', compute='_compute_kayit_sayisi')
+    yerlesim = fields.Selection([
+        ('rulo', 'Rulo (10x8 cm, sayfa başına 1 etiket)'),
+        ('a4_2x3', 'A4 Sayfa - 6 etiket (2x3, 10x8 cm)'),
+        ('a4_3x8', 'A4 Sayfa - 24 etiket (3x8, 70x37 mm)'),
+    ], string='Yerleşim', default='rulo', required=True)
+    baslangic_konumu = fields.Integer(
+        string='Başlangıç Konumu', default=1,
+        help='A4 sayfada ilk etiketin basılacağı hücre (soldan sağa, yukarıdan aşağı). '
+             'Yarım kullanılmış etiket sayfaları için.'
+    )
+
+    @api.model
+    def default_get(self, fields_list):
+        defaults = super().default_get(fields_list)
+        if 'servis_kaydi_ids' in fields_list and self.env.context.get('active_model') == 'servis.kaydi':
+            defaults['servis_kaydi_ids'] = [(6, 0, self.env.context.get('active_ids', []))]
+        return defaults
+
+    @api.depends('servis_kaydi_ids')
+    def _compute_kayit_sayisi(self):
+        for record in self:
+            record.kayit_sayisi = len(record.servis_kaydi_ids)
+
+    def action_yazdir(self):
+        """Seçili kayıtların etiketlerini tek PDF olarak üret"""
+        self.ensure_one()
+        if not self.servis_kaydi_ids:
+            raise UserError('Etiket basılacak servis kaydı seçilmedi!')
+        if self.yerlesim == 'rulo':
+            return self.env.ref('servis_takip.action_report_barkod_etiketi').report_action(self.servis_kaydi_ids)
+        # data ile açılan raporlarda istemci docids'i URL'ye koymaz, id'ler data'da taşınır
+        return self.env.ref('servis_takip.action_report_barkod_etiket_sayfasi').report_action(
+            self.servis_kaydi_ids,
+            data={
+                'servis_kaydi_ids': self.servis_kaydi_ids.ids,
+                'yerlesim': self.yerlesim,
+                'baslangic_konumu': self.baslangic_konumu,
+            },
+        )
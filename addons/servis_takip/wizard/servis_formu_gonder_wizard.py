@@ -1,6 +1,5 @@
 from odoo import models, fields, api
 from odoo.exceptions import UserError
-import base64
 
 
 class ServisFormuGonderWizard(models.TransientModel):
@@ -93,24 +92,22 @@ class ServisFormuGonderWizard(models.TransientModel):
             raise UserError('WhatsApp gonderimi secili oldugu halde telefon numarasi bulunamadi!')
 
         formlar_gonderildi = []
+        form_tipleri = []
 
-        # 1. Formlari arka planda isle (E-posta gonderimi vs.)
         if self.gonder_kabul_formu:
-            self._gonder_formu(
-                self.servis_kaydi_id,
-                'kabul',
-                'servis_takip.report_kabul_formu_template'
-            )
+            form_tipleri.append('kabul')
             formlar_gonderildi.append('Kabul Formu')
 
         if self.gonder_teslim_formu:
-            self._gonder_formu(
-                self.servis_kaydi_id,
-                'teslim',
-                'servis_takip.report_teslim_formu_template'
-            )
+            form_tipleri.append('teslim')
             formlar_gonderildi.append('Teslim Formu')
 
+        # 1. E-postalar kuyruğa alınır; PDF üretimi ve SMTP gönderimi cron'da yapılır
+        if self.gonder_email:
+            self.env['servis.form.gonderim']._kuyruga_ekle(
+                self.servis_kaydi_id, form_tipleri, self.musteri_email
+            )
+
         # 2. WhatsApp seciliyse TEK BIR AKSYON olustur (Mesaj burada birlestiriliyoruz)
         if self.gonder_whatsapp:
             # Secilen formlari metin olarak birlestir
@@ -123,11 +120,15 @@ class ServisFormuGonderWizard(models.TransientModel):
             elif len(telefon) == 11 and telefon.startswith('05'):
                 telefon = '9' + telefon
 
-            # Mesaji olustur
+            # Mesaji olustur (e-posta bu anda sadece kuyrukta, gönderim cron'da yapılır)
+            eposta_notu = (
+                "Form detayları kısa süre içinde e-posta adresinize gönderilecektir.\n\n"
+                if self.gonder_email else "\n\n"
+            )
             mesaj = (
                 f"Merhaba {self.musteri_id.name},\n\n"
                 f"*{self.servis_kaydi_id.name}* numarali servis kaydınıza ait *{form_metni}* hazırlanmıştır. "
-                f"Form detayları e-posta adresinize gonderilmistir.\n\n"
+                f"{eposta_notu}"
                 f"Bizi tercih ettiğiniz için teşekkür ederiz."
             )
             
@@ -144,79 +145,19 @@ class ServisFormuGonderWizard(models.TransientModel):
 
         # 3. Sadece E-Posta seçiliyse başarı mesajı göster
         mesaj_sonuc = '\n'.join(formlar_gonderildi) + '\n\n'
-        mesaj_sonuc += f"✓ E-Posta: {self.musteri_email}\n"
+        mesaj_sonuc += f"✓ E-Posta: {self.musteri_email} (gönderim kuyruğa alındı)\n"
 
         return {
             'type': 'ir.actions.client',
             'tag': 'display_notification',
             'params': {
-                'title': 'Formlar Gönderildi',
+                'title': 'Formlar Kuyruğa Alındı',
                 'message': mesaj_sonuc,
                 'type': 'success',
                 'sticky': False,
             }
         }
 
-    def _gonder_formu(self, servis_kaydi, formu_tipi, report_name):
-        """Formu mail veya whatsapp ile gönder"""
-        
-        try:
-            pdf_content, _ = self.env['ir.actions.report']._render_qweb_pdf(report_name, res_ids=servis_kaydi.ids)
-        except Exception as e:
-            raise UserError(f"PDF oluşturulurken hata oluştu: {str(e)}\n"
-                            f"Lütfen '{report_name}' isimli raporun doğru tanımlandığından emin olun.")
-
-        dosya_adi = f"{servis_kaydi.name}-{formu_tipi.capitalize()}-Formu.pdf"
-
-        # E-Posta gönder
-        if self.gonder_email:
-            self._gonder_email(servis_kaydi, formu_tipi, pdf_content, dosya_adi)
-
-        # WhatsApp gönder
-        if self.gonder_whatsapp:
-            return self._gonder_whatsapp(servis_kaydi, formu_tipi)
-        
-        return False
-
-    def _gonder_email(self, servis_kaydi, formu_tipi, pdf_content, dosya_adi):
-        """Mail ile formu gönder ve eki ekle"""
-        if not self.musteri_email:
-            raise UserError(f'Müşterinin e-posta adresi bulunamadı!')
-
-        # 1. PDF verisini Base64 formatına çevir (Hatanın çözümü burası)
-        # Odoo attachmentları base64 formatında saklar.
-        try:
-            pdf_base64 = base64.b64encode(pdf_content)
-        except Exception:
-            # Eğer zaten base64 gelmişse veya hata oluşursa ham içeriği koru
-            pdf_base64 = pdf_content
-
-        # 2. PDF Ekini (Attachment) Oluştur
-        attachment = self.env['ir.attachment'].create({
-            'name': dosya_adi,
-            'datas': pdf_base64, # Base64'e dönüştürülmüş veri
-            'res_model': 'servis.kaydi',
-            'res_id': servis_kaydi.id,
-            'type': 'binary',
-            'mimetype': 'application/pdf', # Dosya tipini açıkça belirtelim
-        })
-
-        # 3. Mail Nesnesini Oluştur ve Eki Bağla
-        mail_vals = {
-            'subject': f"{servis_kaydi.name} - {formu_tipi.capitalize()} Formu",
-            'body_html': f"""
-                <p>Merhaba {self.musteri_id.name},</p>
-                <p>Teknik servis kaydı <strong>{servis_kaydi.name}</strong> için hazırlanan formu ekte sunulmuştur.</p>
-                <p>Saygılarımızla,<br/>Teknik Servis Takip Sistemi</p>
-            """,
-            'email_from': self.env.company.email or 'noreply@example.com',
-            'email_to': self.musteri_email,
-            'attachment_ids': [(6, 0, [attachment.id])],
-        }
-
-        mail = self.env['mail.mail'].create(mail_vals)
-        mail.send()
-
     def _gonder_whatsapp(self, servis_kaydi, formu_tipi):
         """WhatsApp Web üzerinden mesaj gönderimini başlatır"""
         if not self.musteri_telefon:
@@ -236,7 +177,7 @@ class ServisFormuGonderWizard(models.TransientModel):
             f"Merhaba {self.musteri_id.name},\n\n"
             f"*{servis_kaydi.name}* numaralı servis kaydınız için "
             f"*{formu_tipi.lower()}* formu hazırlanmıştır. "
-            f"Detaylar e-posta adresinize gönderilmiştir.\n\n"
+            f"Detaylar e-posta adresinize gönderilecektir.\n\n"
             f"Bizi tercih ettiğiniz için teşekkür ederiz."
         )
         
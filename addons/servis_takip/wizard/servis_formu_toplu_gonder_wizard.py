@@ -0,0 +1,136 @@
+from odoo import models, fields, api
+from odoo.exceptions import UserError
+
+
+class ServisFormuTopluGonderWizard(models.TransientModel):
+    _name = 'servis.formu.toplu.gonder.wizard'
+    _description = 'Servis Formu Toplu Gönder Wizard'
+
+    servis_kaydi_ids = fields.Many2many('servis.kaydi', string='Servis Kayıtları')
+    gonder_kabul_formu = fields.Boolean(string='Kabul Formu', default=False)
+    gonder_teslim_formu = fields.Boolean(string='Teslim Formu', default=True)
+    state = fields.Selection([
+        ('hazir', 'Hazır'),
+        ('sonuc', 'Sonuç'),
+    ], default='hazir')
+    satir_ids = fields.One2many('servis.formu.toplu.gonder.wizard.satir', 'wizard_id', string='Sonuçlar')
+    kuyruga_alinan_sayisi = fields.Integer(string='Kuyrukta', compute='_compute_ozet')
+    gonderilen_sayisi = fields.Integer(string='Gönderilen', compute='_compute_ozet')
+    hatali_sayisi = fields.Integer(string='Hatalı', compute='_compute_ozet')
+    atlanan_sayisi = fields.Integer(string='Atlanan', compute='_compute_ozet')
+
+    @api.model
+    def default_get(self, fields_list):
+        defaults = super().default_get(fields_list)
+        if 'servis_kaydi_ids' in fields_list and self.env.context.get('active_model') == 'servis.kaydi':
+            defaults['servis_kaydi_ids'] = [(6, 0, self.env.context.get('active_ids', []))]
+        return defaults
+
+    @api.depends('satir_ids.durum')
+    def _compute_ozet(self):
+        for record in self:
+            durumlar = record.satir_ids.mapped('durum')
+            record.kuyruga_alinan_sayisi = durumlar.count('kuyrukta')
+            record.gonderilen_sayisi = durumlar.count('gonderildi')
+            record.hatali_sayisi = durumlar.count('hata')
+            record.atlanan_sayisi = durumlar.count('atlandi')
+
+    def action_gonder(self):
+        """Uygun kayıtların formlarını tek seferde kuyruğa alır, diğerlerini nedeniyle listeler
+
+        PDF üretimi ve gönderim form gönderim kuyruğunda partiler halinde yapılır;
+        satırların sonucu bu işlerin durumundan hesaplanır.
+        """
+        self.ensure_one()
+        if not self.servis_kaydi_ids:
+            raise UserError('Lütfen en az bir servis kaydı seçiniz!')
+        form_tipleri = [tip for tip, secili in (('kabul', self.gonder_kabul_formu),
+                                                 ('teslim', self.gonder_teslim_formu)) if secili]
+        if not form_tipleri:
+            raise UserError('Lütfen en az bir form seçiniz!')
+
+        gonderimler = []
+        satirlar = []
+        for kayit in self.servis_kaydi_ids:
+            email = kayit.musteri_id.email
+            neden = kayit._toplu_form_gonderim_engeli(form_tipleri)
+            if neden:
+                satirlar.append({'servis_kaydi_id': kayit.id, 'email': email, 'atlama_nedeni': neden})
+                continue
+            gonderimler.append((kayit, form_tipleri, email))
+            satirlar.append({'servis_kaydi_id': kayit.id, 'email': email})
+
+        isler = self.env['servis.form.gonderim']._kuyruga_ekle_toplu(gonderimler)
+        kayit_isleri = {}
+        for is_ in isler:
+            kayit_isleri.setdefault(is_.servis_kaydi_id.id, []).append(is_.id)
+        for vals in satirlar:
+            if 'atlama_nedeni' not in vals:
+                vals['gonderim_ids'] = [(6, 0, kayit_isleri.get(vals['servis_kaydi_id'], []))]
+        self.write({
+            'state': 'sonuc',
+            'satir_ids': [(5, 0, 0)] + [(0, 0, vals) for vals in satirlar],
+        })
+        return self._yeniden_ac()
+
+    def action_yenile(self):
+        """Sonuçları gönderim işlerinin güncel durumuyla yeniden göster"""
+        self.ensure_one()
+        return self._yeniden_ac()
+
+    def _yeniden_ac(self):
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }
+
+    def action_kuyrugu_ac(self):
+        """Bu kayıtların gönderim işlerini kuyruk listesinde göster"""
+        self.ensure_one()
+        action = self.env['ir.actions.act_window']._for_xml_id('servis_takip.action_servis_form_gonderim')
+        action['domain'] = [('id', 'in', self.satir_ids.gonderim_ids.ids)]
+        action['context'] = {}
+        return action
+
+
+class ServisFormuTopluGonderWizardSatir(models.TransientModel):
+    _name = 'servis.formu.toplu.gonder.wizard.satir'
+    _description = 'Servis Formu Toplu Gönder Sonuç Satırı'
+
+    wizard_id = fields.Many2one('servis.formu.toplu.gonder.wizard', required=True, ondelete='cascade')
+    servis_kaydi_id = fields.Many2one('servis.kaydi', string='Servis Kaydı', readonly=True)
+    musteri_id = fields.Many2one(related='servis_kaydi_id.musteri_id', string='Müşteri')
+    email = fields.Char(string='E-Posta', readonly=True)
+    gonderim_ids = fields.Many2many('servis.form.gonderim', string='Gönderim İşleri', readonly=True)
+    atlama_nedeni = fields.Char(string='Atlama Nedeni', readonly=True)
+    durum = fields.Selection([
+        ('kuyrukta', 'Kuyrukta'),
+        ('gonderildi', 'Gönderildi'),
+        ('hata', 'Hata'),
+        ('atlandi', 'Atlandı'),
+    ], string='Sonuç', compute='_compute_durum')
+    mesaj = fields.Char(string='Açıklama', compute='_compute_durum')
+
+    @api.depends('atlama_nedeni', 'gonderim_ids.durum', 'gonderim_ids.son_hata')
+    def _compute_durum(self):
+        """Sonuç, kayıt için oluşturulan gönderim işlerinin güncel durumudur
+
+        İşlerden biri hatadaysa hata, hepsi gönderildiyse gönderildi, aksi halde kuyrukta.
+        """
+        for satir in self:
+            isler = satir.gonderim_ids
+            if not isler:
+                satir.durum = 'atlandi'
+                satir.mesaj = satir.atlama_nedeni
+            elif hatali := isler.filtered(lambda i: i.durum == 'hata'):
+                satir.durum = 'hata'
+                satir.mesaj = '; '.join(h for h in hatali.mapped('son_hata') if h) or 'Gönderilemedi.'
+            elif all(i.durum == 'gonderildi' for i in isler):
+                satir.durum = 'gonderildi'
+                satir.mesaj = 'Form(lar) e-posta ile gönderildi.'
+            else:
+                satir.durum = 'kuyrukta'
+                satir.mesaj = 'Gönderim kuyrukta bekliyor.'